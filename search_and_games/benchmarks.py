@@ -0,0 +1,569 @@
+# benchmarks.py
+# -------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Micro-benchmarks for the game engine and the search agents.
+
+Run a single benchmark with
+
+> python benchmarks.py successors
+
+or every benchmark with
+
+> python benchmarks.py all
+"""
+
+import sys
+import time
+import tracemalloc
+
+import layout
+from game import GameStateData
+from pacman import GameState
+
+
+def initialState(layoutName, numGhosts=4):
+    state = GameState()
+    state.initialize(layout.getLayout(layoutName), numGhosts)
+    return state
+
+
+def expandTree(state, maxSuccessors):
+    """
+    Expands the game tree under state breadth first, with agents taking turns,
+    until maxSuccessors states have been generated.  Every generated state is
+    kept alive, as it would be in a search tree.
+    """
+    numAgents = state.getNumAgents()
+    frontier = [(state, 0)]
+    tree = []
+    while frontier and len(tree) < maxSuccessors:
+        nextFrontier = []
+        for parent, agentIndex in frontier:
+            for action in parent.getLegalActions(agentIndex):
+                child = parent.generateSuccessor(agentIndex, action)
+                tree.append(child)
+                nextFrontier.append((child, (agentIndex + 1) % numAgents))
+                if len(tree) == maxSuccessors:
+                    return tree
+        frontier = nextFrontier
+    return tree
+
+
+def benchmarkSuccessors(layouts=('mediumClassic', 'originalClassic'), maxSuccessors=20000):
+    """
+    Compares successor generation with and without copy-on-write GameStateData.
+    """
+    print('%-16s %-14s %14s %16s' % ('layout', 'mode', 'successors/s', 'bytes/successor'))
+    for layoutName in layouts:
+        for copyOnWrite in [False, True]:
+            GameStateData.copyOnWrite = copyOnWrite
+            state = initialState(layoutName)
+
+            start = time.perf_counter()
+            tree = expandTree(state, maxSuccessors)
+            elapsed = time.perf_counter() - start
+            numSuccessors = len(tree)
+            del tree
+
+            tracemalloc.start()
+            tree = expandTree(state, maxSuccessors)
+            retained, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del tree
+
+            mode = 'copy-on-write' if copyOnWrite else 'eager copy'
+            print('%-16s %-14s %14.0f %16.0f' % (layoutName, mode, numSuccessors / elapsed,
+                                                  retained / float(numSuccessors)))
+    GameStateData.copyOnWrite = True
+
+
+def benchmarkAlphaBeta(layouts=('minimaxClassic', 'smallClassic', 'mediumClassic'), depths=(2, 3, 4)):
+    """
+    Counts the nodes expanded by MultiPacmanAgent and AlphaBetaPacmanAgent
+    (with every move ordering) choosing pacman's first move, and checks that
+    they agree on its value.
+    """
+    import multiAgents
+    orderings = sorted(multiAgents.MOVE_ORDERINGS.keys())
+    print('%-16s %5s %10s' % ('layout', 'depth', 'minimax') + ''.join(['%10s' % o for o in orderings]))
+    for layoutName in layouts:
+        state = initialState(layoutName)
+        for depth in depths:
+            minimaxAgent = multiAgents.MultiPacmanAgent(depth=str(depth))
+            _, value = minimaxAgent.minimax(state, 0, 0)
+            counts = [minimaxAgent.nodesExpanded]
+            for ordering in orderings:
+                agent = multiAgents.AlphaBetaPacmanAgent(depth=str(depth), ordering=ordering)
+                _, alphaBetaValue = agent.minimax(state, 0, 0)
+                if alphaBetaValue != value:
+                    raise Exception('Alpha-beta (%s) found value %s, minimax %s' % (ordering, alphaBetaValue, value))
+                counts.append(agent.nodesExpanded)
+            print('%-16s %5d' % (layoutName, depth) + ''.join(['%10d' % c for c in counts]))
+
+
+def benchmarkMCTS(layouts=('smallClassic', 'mediumClassic', 'originalClassic'), iterations=300, depth=2):
+    """
+    Reports MCTSPacmanAgent rollouts per second next to the nodes per second
+    of MultiPacmanAgent and AlphaBetaPacmanAgent choosing the same first move.
+    """
+    import multiAgents
+    print('%-16s %14s %18s %18s' % ('layout', 'rollouts/s', 'minimax nodes/s', 'alphabeta nodes/s'))
+    for layoutName in layouts:
+        state = initialState(layoutName)
+        mcts = multiAgents.MCTSPacmanAgent(iterations=str(iterations))
+        mcts.getAction(state)
+        rates = [mcts.rollouts / mcts.searchTime]
+        for agent in [multiAgents.MultiPacmanAgent(depth=str(depth)),
+                      multiAgents.AlphaBetaPacmanAgent(depth=str(depth))]:
+            start = time.perf_counter()
+            agent.getAction(state)
+            rates.append(agent.nodesExpanded / (time.perf_counter() - start))
+        print('%-16s %14.0f %18.0f %18.0f' % tuple([layoutName] + rates))
+
+
+def benchmarkParallel(layouts=('mediumClassic', 'originalClassic'), depths=(3, 4), workerCounts=None):
+    """
+    Compares the time MultiPacmanAgent and ParallelMultiPacmanAgent take to
+    choose pacman's first move.  The worker pool is started before timing.
+    """
+    import os
+    import multiAgents
+    if workerCounts == None:
+        workerCounts = sorted(set([2, os.cpu_count() or 1]))
+    print('%d CPUs' % (os.cpu_count() or 1))
+    print('%-16s %5s %12s' % ('layout', 'depth', 'sequential') +
+          ''.join(['%12s' % ('%d workers' % n) for n in workerCounts]) + '   speedup')
+    for layoutName in layouts:
+        state = initialState(layoutName)
+        for depth in depths:
+            agent = multiAgents.MultiPacmanAgent(depth=str(depth))
+            start = time.perf_counter()
+            agent.getAction(state)
+            times = [time.perf_counter() - start]
+            for workers in workerCounts:
+                agent = multiAgents.ParallelMultiPacmanAgent(depth=str(depth), workers=str(workers))
+                agent.getPool(state.data.layout).submit(int).result()
+                start = time.perf_counter()
+                agent.getAction(state)
+                times.append(time.perf_counter() - start)
+                agent.shutdown()
+            print('%-16s %5d' % (layoutName, depth) + ''.join(['%11.2fs' % t for t in times]) +
+                  '%9.2fx' % (times[0] / min(times[1:])))
+
+
+def benchmarkSimulation(layouts=('smallClassic', 'mediumClassic', 'originalClassic'), numGames=20):
+    """
+    Compares the turns per second of quiet Game.run when every agent is handed
+    a copy of the state and when the agents (which only read it) declare
+    mutatesState = False and see the game's own state, playing the same seeded
+    games between cheap agents.
+    """
+    import random
+    import ghostAgents
+    import pacmanAgents
+    import textDisplay
+    from pacman import ClassicGameRules
+    print('%-16s %12s %14s %14s %9s' % ('layout', 'turns', 'copy turns/s', 'share turns/s', 'speedup'))
+    for layoutName in layouts:
+        maze = layout.getLayout(layoutName)
+        rates = []
+        for mutatesState in [True, False]:
+            rules = ClassicGameRules()
+            turns = 0
+            elapsed = 0.0
+            for i in range(numGames):
+                random.seed('simulation-%d' % i)
+                agents = [pacmanAgents.GreedyAgent()] + [ghostAgents.RandomGhost(index + 1)
+                                                         for index in range(maze.getNumGhosts())]
+                for agent in agents:
+                    agent.mutatesState = mutatesState
+                game = rules.newGame(maze, agents[:1], agents[1:], textDisplay.NullGraphics(), True)
+                start = time.perf_counter()
+                game.run(recordHistory=False)
+                elapsed += time.perf_counter() - start
+                turns += game.numTurns
+            rates.append(turns / elapsed)
+        print('%-16s %12d %14.0f %14.0f %8.2fx' % (layoutName, turns, rates[0], rates[1], rates[1] / rates[0]))
+
+
+def bfsDistance(walls, start, goal):
+    "The maze distance from start to goal, by a breadth first search of its own."
+    from collections import deque
+    distances = {start: 0}
+    queue = deque([start])
+    while queue:
+        x, y = position = queue.popleft()
+        if position == goal:
+            return distances[position]
+        for nextPosition in [(x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y)]:
+            if not walls[nextPosition[0]][nextPosition[1]] and nextPosition not in distances:
+                distances[nextPosition] = distances[position] + 1
+                queue.append(nextPosition)
+    return None
+
+
+def benchmarkDistances(layouts=('mediumClassic', 'originalClassic', 'bigMaze'), numQueries=2000):
+    """
+    Reports the time to build each layout's DistanceTable and compares its
+    lookups with a breadth first search per query.
+    """
+    import random
+    from layout import DistanceTable
+    print('%-16s %6s %10s %14s %14s' % ('layout', 'cells', 'build', 'bfs queries/s', 'table queries/s'))
+    for layoutName in layouts:
+        maze = layout.getLayout(layoutName)
+        start = time.perf_counter()
+        table = DistanceTable(maze.walls)
+        build = time.perf_counter() - start
+        random.seed(layoutName)
+        queries = [(random.choice(table.cells), random.choice(table.cells)) for i in range(numQueries)]
+
+        start = time.perf_counter()
+        expected = [bfsDistance(maze.walls, a, b) for a, b in queries]
+        bfsRate = numQueries / (time.perf_counter() - start)
+        start = time.perf_counter()
+        found = [table.distance(a, b) for a, b in queries]
+        tableRate = numQueries / (time.perf_counter() - start)
+        if found != expected:
+            raise Exception('DistanceTable disagrees with breadth first search on ' + layoutName)
+        print('%-16s %6d %9.3fs %14.0f %14.0f' % (layoutName, table.numCells, build, bfsRate, tableRate))
+
+
+def benchmarkFeatures(layouts=('mediumClassic', 'originalClassic'), numStates=5000, batchSizes=(1, 64, 512)):
+    """
+    Compares featureEvaluationFunction scoring states one at a time in plain
+    Python with scoring them in batches (vectorized when NumPy is installed),
+    next to the default heuristicEvaluationFunction.
+    """
+    import features
+    import multiAgents
+    print('NumPy %s' % ('enabled' if features._NUMPY_ENABLED else 'not installed'))
+    print('%-16s %14s %14s' % ('layout', 'heuristic/s', 'python/s') +
+          ''.join(['%14s' % ('batch %d/s' % size) for size in batchSizes]))
+    for layoutName in layouts:
+        states = expandTree(initialState(layoutName), numStates)
+        start = time.perf_counter()
+        for state in states:
+            multiAgents.heuristicEvaluationFunction(state, 0)
+        rates = [len(states) / (time.perf_counter() - start)]
+
+        evaluator = features.FeatureEvaluator()
+        extractor = evaluator.extractor(0)
+        arrays = extractor.layoutArrays(states[0].data.layout)
+        start = time.perf_counter()
+        for state in states:
+            extractor.extractList(state, arrays)
+        rates.append(len(states) / (time.perf_counter() - start))
+        for size in batchSizes:
+            start = time.perf_counter()
+            for i in range(0, len(states), size):
+                evaluator.evaluateBatch(states[i:i + size], 0)
+            rates.append(len(states) / (time.perf_counter() - start))
+        print('%-16s' % layoutName + ''.join(['%14.0f' % rate for rate in rates]))
+
+
+def benchmarkBatch(layouts=('mediumClassic', 'originalClassic'), depth=3, batches=('0', '1', None, '100')):
+    """
+    Times MultiPacmanAgent choosing pacman's first move with
+    featureEvaluationFunction, scoring leaves one at a time (batch=0) and in
+    batches of the last plies (batch=None is the default, one round of moves).
+    """
+    import multiAgents
+    print('%-16s %8s %10s %14s %10s' % ('layout', 'batch', 'leaves', 'leaves/call', 'time'))
+    for layoutName in layouts:
+        state = initialState(layoutName)
+        for batch in batches:
+            agent = multiAgents.MultiPacmanAgent(evalFn='featureEvaluationFunction', depth=str(depth), batch=batch)
+            start = time.perf_counter()
+            agent.getAction(state)
+            elapsed = time.perf_counter() - start
+            leavesPerCall = agent.leavesEvaluated / float(agent.batchesEvaluated)
+            print('%-16s %8s %10d %14.1f %9.3fs' % (layoutName, batch, agent.leavesEvaluated, leavesPerCall, elapsed))
+
+
+def searchProblem(layoutName, problemType=None):
+    import searchAgents
+    problemType = problemType or searchAgents.PositionSearchProblem
+    state = GameState()
+    state.initialize(layout.getLayout(layoutName), 0)
+    if problemType == searchAgents.PositionSearchProblem:
+        return problemType(state, warn=False, visualize=False)
+    return problemType(state)
+
+
+def benchmarkSearch(layouts=('mediumMaze', 'bigMaze', 'openMaze'),
+                    functions=('breadthFirstSearch', 'iterativeDeepeningSearch', 'aStarSearch',
+                               'bidirectionalSearch')):
+    """
+    Reports the statistics of each search function finding the path to (1, 1)
+    on each maze.
+    """
+    import search
+    import searchAgents
+    print('%-12s %-26s %6s %10s %10s %12s %9s' % ('layout', 'function', 'cost', 'expanded', 'generated',
+                                                 'max frontier', 'time'))
+    for layoutName in layouts:
+        for name in functions:
+            problem = searchProblem(layoutName)
+            if name == 'aStarSearch':
+                plan = search.aStarSearch(problem, searchAgents.manhattanHeuristic)
+            else:
+                plan = getattr(search, name)(problem)
+            statistics = plan.statistics
+            print('%-12s %-26s %6d %10d %10d %12d %8.3fs' % (layoutName, name, problem.getCostOfActions(plan),
+                                                             statistics.expanded, statistics.generated,
+                                                             statistics.maxFrontier, statistics.time))
+
+
+def queueWorkload(queue, size, seed):
+    """
+    Pushes size items, then lowers the priority of size random queued items
+    while popping half as many, then pops the rest.
+    """
+    import random
+    random.seed(seed)
+    for item in range(size):
+        queue.push(item, random.random() + 1)
+    queued = set(range(size))
+    for i in range(size):
+        queue.update(random.randrange(size) if queued else 0, random.random())
+        if i % 2:
+            queued.discard(queue.pop())
+    while not queue.isEmpty():
+        queue.pop()
+
+
+def benchmarkPriorityQueue(sizes=(1000, 2000, 4000), layouts=('bigMaze', 'openMaze')):
+    """
+    Compares util.PriorityQueue with util.IndexedPriorityQueue on a workload
+    of pushes, updates and pops, and as the frontier of A* searches that
+    update queued nodes.
+    """
+    import search
+    import searchAgents
+    import util
+    queues = [util.PriorityQueue, util.IndexedPriorityQueue]
+    print('%-24s %18s %18s' % ('workload', 'PriorityQueue', 'IndexedPriorityQueue'))
+    for size in sizes:
+        times = []
+        for queueType in queues:
+            start = time.perf_counter()
+            queueWorkload(queueType(), size, size)
+            times.append(time.perf_counter() - start)
+        print('%-24s %17.3fs %17.3fs' % ('%d items' % size, times[0], times[1]))
+    for layoutName in layouts:
+        times = []
+        for queueType in queues:
+            problem = searchProblem(layoutName)
+            start = time.perf_counter()
+            search.graphSearch(problem, queueType(),
+                               lambda node: node.path_cost + searchAgents.manhattanHeuristic(node.state, problem))
+            times.append(time.perf_counter() - start)
+        print('%-24s %17.3fs %17.3fs' % ('A* on ' + layoutName, times[0], times[1]))
+
+
+def benchmarkJumpPoint(layouts=('bigMaze', 'openMaze', 'contoursMaze', 'mediumDottedMaze')):
+    """
+    Compares A* with the Manhattan heuristic and jump point search finding
+    pacman's path to (1, 1).
+    """
+    import search
+    import searchAgents
+    print('%-18s %6s %12s %10s %12s %10s' % ('layout', 'cost', 'A* expanded', 'time', 'JPS expanded', 'time'))
+    for layoutName in layouts:
+        results = []
+        for searchFunction in [search.aStarSearch, search.jumpPointSearch]:
+            problem = searchProblem(layoutName)
+            plan = searchFunction(problem, searchAgents.manhattanHeuristic)
+            results.append((problem.getCostOfActions(plan), plan.statistics))
+        if results[0][0] != results[1][0]:
+            raise Exception('Jump point search found a path of cost %d, A* %d' % (results[1][0], results[0][0]))
+        print('%-18s %6d %12d %9.4fs %12d %9.4fs' % (layoutName, results[0][0], results[0][1].expanded,
+                                                    results[0][1].time, results[1][1].expanded, results[1][1].time))
+
+
+def benchmarkMultiGoal(layouts=('mediumSearch', 'bigSearch', 'mediumDottedMaze')):
+    """
+    Compares finding the distances from pacman to every food with one
+    multiGoalSearch sweep and with one bidirectional search per food.
+    """
+    import search
+    print('%-18s %6s %18s %10s %18s %10s' % ('layout', 'food', 'sweep expanded', 'time',
+                                            'per-food expanded', 'time'))
+    for layoutName in layouts:
+        problem = searchProblem(layoutName)
+        food = layout.getLayout(layoutName).food.asList()
+        start = time.perf_counter()
+        plans = search.multiGoalSearch(problem, food)
+        sweepTime = time.perf_counter() - start
+        sweepExpanded = problem._expanded
+
+        expanded = 0
+        start = time.perf_counter()
+        for goal in food:
+            goalProblem = searchProblem(layoutName)
+            goalProblem.goal = goal
+            if len(search.bidirectionalSearch(goalProblem)) != len(plans[goal]):
+                raise Exception('multiGoalSearch disagrees with bidirectionalSearch on ' + layoutName)
+            expanded += goalProblem._expanded
+        print('%-18s %6d %18d %9.3fs %18d %9.3fs' % (layoutName, len(food), sweepExpanded, sweepTime, expanded,
+                                                    time.perf_counter() - start))
+
+
+class ExpansionLimitReached(Exception):
+    pass
+
+
+def limitExpansions(problem, maxExpanded):
+    """
+    Makes problem raise ExpansionLimitReached when a search tries to expand
+    more than maxExpanded states.
+    """
+    getActions = problem.getActions
+
+    def limitedGetActions(state):
+        if problem._expanded >= maxExpanded:
+            raise ExpansionLimitReached()
+        return getActions(state)
+    problem.getActions = limitedGetActions
+
+
+def benchmarkFoodSearch(layouts=('trickySearch', 'mediumSearch', 'bigSearch'), maxExpanded=20000):
+    """
+    Compares A* on the (position, foodGrid) states of FoodSearchProblem and
+    the compact states of CompactFoodSearchProblem, with the amount of food
+    left as the heuristic.  Searches that have not finished after maxExpanded
+    expansions are stopped, so the time is for the same work either way.
+    """
+    import search
+    import searchAgents
+    problemTypes = [searchAgents.FoodSearchProblem, searchAgents.CompactFoodSearchProblem]
+    foodLeft = lambda state, problem: problem.getFoodCount(state)
+    print('%-14s %6s %10s %18s %18s' % ('layout', 'cost', 'expanded', 'FoodSearchProblem',
+                                        'CompactFoodSearch'))
+    for layoutName in layouts:
+        results = []
+        for problemType in problemTypes:
+            problem = searchProblem(layoutName, problemType)
+            limitExpansions(problem, maxExpanded)
+            start = time.perf_counter()
+            try:
+                cost = problem.getCostOfActions(search.aStarSearch(problem, foodLeft))
+            except ExpansionLimitReached:
+                cost = None
+            results.append((cost, problem._expanded, time.perf_counter() - start))
+        if results[0][:2] != results[1][:2]:
+            raise Exception('The food search encodings disagree on ' + layoutName)
+        cost, expanded = results[0][:2]
+        print('%-14s %6s %10d %17.3fs %17.3fs' % (layoutName, '-' if cost == None else cost, expanded,
+                                                 results[0][2], results[1][2]))
+
+
+def benchmarkFoodHeuristics(layouts=('trickySearch', 'mediumSearch', 'bigSearch'),
+                            heuristics=('farthestFoodHeuristic', 'foodPairHeuristic', 'foodMSTHeuristic',
+                                        'foodHeuristic'),
+                            maxExpanded=2000):
+    """
+    Reports A* with each food heuristic on CompactFoodSearchProblem, with the
+    time spent in the heuristic per call and how often its cache of food sets
+    was hit.  Searches that have not finished after maxExpanded expansions
+    are stopped.
+    """
+    import search
+    import searchAgents
+    print('%-14s %-22s %6s %10s %9s %12s %9s' % ('layout', 'heuristic', 'cost', 'expanded', 'time',
+                                                'us per call', 'hit rate'))
+    for layoutName in layouts:
+        for name in heuristics:
+            problem = searchProblem(layoutName, searchAgents.CompactFoodSearchProblem)
+            limitExpansions(problem, maxExpanded)
+            start = time.perf_counter()
+            try:
+                cost = problem.getCostOfActions(search.aStarSearch(problem, getattr(searchAgents, name)))
+            except ExpansionLimitReached:
+                cost = None
+            elapsed = time.perf_counter() - start
+            info = problem.heuristicInfo['food']
+            print('%-14s %-22s %6s %10d %8.3fs %12.1f %8.1f%%' % (
+                layoutName, name, '-' if cost == None else cost, problem._expanded, elapsed,
+                1e6 * info.time / info.calls, 100.0 * info.hits / (info.hits + info.misses)))
+
+
+def benchmarkPuzzles(puzzles=((3, 100), (4, 60)), numPuzzles=10):
+    """
+    Solves numPuzzles random sliding puzzles of each (size, random moves)
+    with A* and IDA* on the pattern database heuristic, and reports the time
+    to build the pattern databases and to map them from disk.
+    """
+    import random
+    import eightpuzzle
+    import search
+    print('%-10s %10s %12s %10s %12s %10s' % ('puzzle', 'mean cost', 'A* expanded', 'time',
+                                              'IDA* expanded', 'time'))
+    for size, moves in puzzles:
+        databases = [eightpuzzle.PatternDatabase(size, pattern) for pattern in eightpuzzle.PATTERNS[size]]
+        start = time.perf_counter()
+        for database in databases:
+            database.build()
+        buildTime = time.perf_counter() - start
+        start = time.perf_counter()
+        heuristic = eightpuzzle.PatternDatabaseHeuristic(size)
+        heuristic(eightpuzzle.createRandomEightPuzzle(0, size))
+        loadTime = time.perf_counter() - start
+
+        random.seed(size)
+        cost = 0
+        results = [[0, 0.0], [0, 0.0]]
+        for i in range(numPuzzles):
+            problem = eightpuzzle.EightPuzzleSearchProblem(eightpuzzle.createRandomEightPuzzle(moves, size))
+            plans = [search.aStarSearch(problem, heuristic), search.iterativeDeepeningAStarSearch(problem, heuristic)]
+            if len(plans[0]) != len(plans[1]):
+                raise Exception('A* and IDA* disagree on the length of a solution')
+            cost += len(plans[0])
+            for result, plan in zip(results, plans):
+                result[0] += plan.statistics.expanded
+                result[1] += plan.statistics.time
+        print('%-10s %10.1f %12d %9.3fs %12d %9.3fs' % ('%dx%d' % (size, size), cost / float(numPuzzles),
+                                                       results[0][0], results[0][1], results[1][0], results[1][1]))
+        print('%-10s pattern databases built in %.3fs, loaded in %.3fs' % ('', buildTime, loadTime))
+
+
+BENCHMARKS = {
+    'successors': benchmarkSuccessors,
+    'alphabeta': benchmarkAlphaBeta,
+    'batch': benchmarkBatch,
+    'distances': benchmarkDistances,
+    'features': benchmarkFeatures,
+    'foodheuristics': benchmarkFoodHeuristics,
+    'foodsearch': benchmarkFoodSearch,
+    'jps': benchmarkJumpPoint,
+    'mcts': benchmarkMCTS,
+    'multigoal': benchmarkMultiGoal,
+    'parallel': benchmarkParallel,
+    'priorityqueue': benchmarkPriorityQueue,
+    'puzzles': benchmarkPuzzles,
+    'search': benchmarkSearch,
+    'simulation': benchmarkSimulation,
+}
+
+if __name__ == '__main__':
+    names = sys.argv[1:] or ['all']
+    if names == ['all']:
+        names = sorted(BENCHMARKS.keys())
+    for name in names:
+        if name not in BENCHMARKS:
+            raise Exception('Unknown benchmark ' + name + '; choose from ' + ', '.join(sorted(BENCHMARKS.keys())))
+        print('== %s ==' % name)
+        BENCHMARKS[name]()
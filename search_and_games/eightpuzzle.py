@@ -14,6 +14,9 @@
 
 import search
 import random
+import os
+import mmap
+from array import array
 
 # Module Classes
 
@@ -25,6 +28,9 @@ class EightPuzzleState:
     This class defines the mechanics of the puzzle itself.  The
     task of recasting this puzzle as a search problem is left to
     the EightPuzzleSearchProblem class.
+
+    Larger sliding puzzles work the same way: sixteen numbers make a
+    Fifteen Puzzle on a 4x4 board.
     """
 
     def __init__( self, numbers ):
@@ -32,7 +38,8 @@ class EightPuzzleState:
           Constructs a new eight puzzle from an ordering of numbers.
 
         numbers: a list of integers from 0 to 8 representing an
-          instance of the eight puzzle.  0 represents the blank
+          instance of the eight puzzle (or from 0 to size * size - 1
+          for a size x size puzzle).  0 represents the blank
           space.  Thus, the list
 
             [1, 0, 2, 3, 4, 5, 6, 7, 8]
@@ -49,12 +56,15 @@ class EightPuzzleState:
         The configuration of the puzzle is stored in a 2-dimensional
         list (a list of lists) 'cells'.
         """
+        self.size = int(round(len(numbers) ** 0.5))
+        if self.size * self.size != len(numbers):
+            raise Exception('A sliding puzzle needs a square number of cells, not %d' % len(numbers))
         self.cells = []
-        numbers = numbers[:] # Make a copy so as not to cause side-effects.
+        numbers = list(numbers) # Make a copy so as not to cause side-effects.
         numbers.reverse()
-        for row in range( 3 ):
+        for row in range( self.size ):
             self.cells.append( [] )
-            for col in range( 3 ):
+            for col in range( self.size ):
                 self.cells[row].append( numbers.pop() )
                 if self.cells[row][col] == 0:
                     self.blankLocation = row, col
@@ -78,8 +88,8 @@ class EightPuzzleState:
         False
         """
         current = 0
-        for row in range( 3 ):
-            for col in range( 3 ):
+        for row in range( self.size ):
+            for col in range( self.size ):
                 if current != self.cells[row][col]:
                     return False
                 current += 1
@@ -99,11 +109,11 @@ class EightPuzzleState:
         row, col = self.blankLocation
         if(row != 0):
             moves.append('up')
-        if(row != 2):
+        if(row != self.size - 1):
             moves.append('down')
         if(col != 0):
             moves.append('left')
-        if(col != 2):
+        if(col != self.size - 1):
             moves.append('right')
         return moves
 
@@ -133,10 +143,10 @@ class EightPuzzleState:
             newrow = row
             newcol = col + 1
         else:
-            raise "Illegal Move"
+            raise Exception('Illegal move: %s' % move)
 
         # Create a copy of the current eightPuzzle
-        newPuzzle = EightPuzzleState([0, 0, 0, 0, 0, 0, 0, 0, 0])
+        newPuzzle = EightPuzzleState([0] * (self.size * self.size))
         newPuzzle.cells = [values[:] for values in self.cells]
         # And update it to reflect the move
         newPuzzle.cells[row][col] = self.cells[newrow][newcol]
@@ -155,27 +165,34 @@ class EightPuzzleState:
               EightPuzzleState([1, 0, 2, 3, 4, 5, 6, 7, 8]).result('left')
           True
         """
-        for row in range( 3 ):
-            if self.cells[row] != other.cells[row]:
-                return False
-        return True
+        return self.cells == other.cells
 
     def __hash__(self):
-        return hash(str(self.cells))
+        return hash(self.tiles())
+
+    def tiles(self):
+        """
+          Returns the numbers of the puzzle as a tuple, row by row.
+
+        >>> EightPuzzleState([1, 0, 2, 3, 4, 5, 6, 7, 8]).tiles()
+        (1, 0, 2, 3, 4, 5, 6, 7, 8)
+        """
+        return tuple([number for row in self.cells for number in row])
 
     def __getAsciiString(self):
         """
           Returns a display string for the maze
         """
         lines = []
-        horizontalLine = ('-' * (13))
+        width = len(str(self.size * self.size - 1))
+        horizontalLine = ('-' * ((width + 3) * self.size + 1))
         lines.append(horizontalLine)
         for row in self.cells:
             rowLine = '|'
             for col in row:
                 if col == 0:
                     col = ' '
-                rowLine = rowLine + ' ' + col.__str__() + ' |'
+                rowLine = rowLine + ' ' + col.__str__().rjust(width) + ' |'
             lines.append(rowLine)
             lines.append(horizontalLine)
         return '\n'.join(lines)
@@ -183,8 +200,6 @@ class EightPuzzleState:
     def __str__(self):
         return self.__getAsciiString()
 
-# TODO: Implement The methods in this class
-
 class EightPuzzleSearchProblem(search.SearchProblem):
     """
       Implementation of a SearchProblem for the  Eight Puzzle domain
@@ -196,7 +211,7 @@ class EightPuzzleSearchProblem(search.SearchProblem):
         self.puzzle = puzzle
 
     def getStartState(self):
-        return puzzle
+        return self.puzzle
 
     def goalTest(self,state):
         return state.isGoal()
@@ -210,12 +225,16 @@ class EightPuzzleSearchProblem(search.SearchProblem):
 
     def getResult(self,state, action):
         """
-        Given a state and an action, returns resulting state and a cost of 1, which is
-        the incremental cost of expanding to that successor.
-        Returns (next_state, cost)
+        Given a state and an action, returns resulting state.
         """
-        return (state.result(a), 1)
-    
+        return state.result(action)
+
+    def getCost(self, state, action):
+        """
+        Every move costs 1.
+        """
+        return 1
+
     def getCostOfActions(self, actions):
         """
          actions: A list of actions to take
@@ -252,28 +271,172 @@ def loadEightPuzzle(puzzleNumber):
     """
     return EightPuzzleState(EIGHT_PUZZLE_DATA[puzzleNumber])
 
-def createRandomEightPuzzle(moves=100):
+def createRandomEightPuzzle(moves=100, size=3):
     """
       moves: number of random moves to apply
+      size: the number of rows and columns; 4 makes a fifteen puzzle
 
       Creates a random eight puzzle by applying
       a series of 'moves' random moves to a solved
       puzzle.
     """
-    puzzle = EightPuzzleState([0,1,2,3,4,5,6,7,8])
+    puzzle = EightPuzzleState(list(range(size * size)))
     for i in range(moves):
         # Execute a random legal move
         puzzle = puzzle.result(random.sample(puzzle.legalMoves(), 1)[0])
     return puzzle
 
+# Pattern databases
+
+PATTERN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '__cache__')
+
+# Disjoint groups of tiles whose pattern databases are added together
+PATTERNS = {
+    3: [(1, 2, 3, 4), (5, 6, 7, 8)],
+    4: [(1, 2, 3, 4, 5), (6, 7, 8, 9, 10), (11, 12, 13, 14, 15)],
+}
+
+class PatternDatabase:
+    """
+    The fewest moves of the tiles in pattern that bring them from any
+    placement to their goal positions, moving only them: a tile may slide
+    into any neighboring cell that is not covered by another tile of the
+    pattern, as if the other tiles were all blanks.  Every move of the
+    puzzle moves one tile, so the databases of disjoint patterns can be
+    added and the sum is still an admissible, consistent heuristic.
+
+    Cells are numbered row by row, and the placement of the pattern's tiles
+    at cells p0, p1, ... is entry p0 + p1 * n + p2 * n**2 + ... of a byte
+    table, where n is the number of cells.  The table is found by a breadth
+    first search back from the goal, saved in PATTERN_DIR, and memory mapped
+    when loaded again, so processes share one copy.
+    """
+    UNREACHED = 0xFF
+
+    def __init__(self, size, pattern):
+        self.size = size
+        self.pattern = tuple(pattern)
+        numCells = size * size
+        self.weights = [numCells ** i for i in range(len(self.pattern))]
+        self.tableSize = numCells ** len(self.pattern)
+        self.table = None
+
+    def path(self):
+        return os.path.join(PATTERN_DIR, 'puzzle%d-%s.pdb' % (self.size, '-'.join(map(str, self.pattern))))
+
+    def load(self):
+        """
+        Maps the table saved on disk, building and saving it first if there
+        is none.  Returns self.
+        """
+        try:
+            f = open(self.path(), 'rb')
+        except IOError:
+            f = None
+        if f != None:
+            try:
+                if os.fstat(f.fileno()).st_size == self.tableSize:
+                    self.table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    return self
+            finally:
+                f.close()
+        self.table = self.build()
+        try:
+            os.makedirs(PATTERN_DIR, exist_ok=True)
+            tempPath = '%s.%d' % (self.path(), os.getpid())
+            f = open(tempPath, 'wb')
+            try:
+                self.table.tofile(f)
+            finally:
+                f.close()
+            os.replace(tempPath, self.path())
+        except OSError:
+            pass
+        return self
+
+    def build(self):
+        """
+        Returns the table as an array of bytes, found by a breadth first
+        search from the goal placement.
+        """
+        size = self.size
+        numCells = size * size
+        neighbors = []
+        for cell in range(numCells):
+            row, col = divmod(cell, size)
+            neighbors.append([r * size + c for r, c in [(row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)]
+                              if 0 <= r < size and 0 <= c < size])
+        table = array('B', [self.UNREACHED]) * self.tableSize
+        # Tile t belongs at cell t
+        goal = self.index(dict([(tile, tile) for tile in self.pattern]))
+        table[goal] = 0
+        frontier = [goal]
+        depth = 0
+        while frontier:
+            depth += 1
+            nextFrontier = []
+            for index in frontier:
+                positions = []
+                rest = index
+                for _ in self.pattern:
+                    rest, cell = divmod(rest, numCells)
+                    positions.append(cell)
+                for cell, weight in zip(positions, self.weights):
+                    for neighbor in neighbors[cell]:
+                        if neighbor not in positions:
+                            child = index + (neighbor - cell) * weight
+                            if table[child] == self.UNREACHED:
+                                table[child] = depth
+                                nextFrontier.append(child)
+            frontier = nextFrontier
+        return table
+
+    def index(self, positionOf):
+        "Returns the table entry of the placement where tile t is at positionOf[t]."
+        return sum([positionOf[tile] * weight for tile, weight in zip(self.pattern, self.weights)])
+
+    def lookup(self, positionOf):
+        return self.table[self.index(positionOf)]
+
+class PatternDatabaseHeuristic:
+    """
+    The sum of the pattern databases of disjoint groups of tiles, an
+    admissible heuristic for EightPuzzleSearchProblem.  The databases are
+    loaded on first use.  patternDatabaseHeuristic picks the databases for
+    the size of the puzzle it is given:
+
+    > search.iterativeDeepeningAStarSearch(EightPuzzleSearchProblem(puzzle), patternDatabaseHeuristic)
+    """
+    def __init__(self, size=3, patterns=None):
+        self.size = size
+        self.patterns = patterns or PATTERNS[size]
+        self.databases = None
+
+    def __call__(self, state, problem=None):
+        if self.databases == None:
+            self.databases = [PatternDatabase(self.size, pattern).load() for pattern in self.patterns]
+        positionOf = [0] * (self.size * self.size)
+        for cell, tile in enumerate(state.tiles()):
+            positionOf[tile] = cell
+        return sum([database.lookup(positionOf) for database in self.databases])
+
+_patternHeuristics = {}
+
+def patternDatabaseHeuristic(state, problem=None):
+    "The PatternDatabaseHeuristic with the default PATTERNS for the size of state."
+    heuristic = _patternHeuristics.get(state.size)
+    if heuristic == None:
+        heuristic = _patternHeuristics[state.size] = PatternDatabaseHeuristic(state.size)
+    return heuristic(state, problem)
+
 if __name__ == '__main__':
     puzzle = createRandomEightPuzzle(25)
     print('A random puzzle:')
     print(puzzle)
 
     problem = EightPuzzleSearchProblem(puzzle)
-    path = search.iterativeDeepeningSearch(problem)
-    print('IDS found a path of %d moves: %s' % (len(path), str(path)))
+    path = search.iterativeDeepeningAStarSearch(problem, patternDatabaseHeuristic)
+    print('IDA* found a path of %d moves: %s' % (len(path), str(path)))
     curr = puzzle
     i = 1
     for a in path:
@@ -0,0 +1,227 @@
+# features.py
+# -----------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Food and ghost features of game states, and an evaluation function built on
+them for the multi-agent search agents:
+
+> python pacman.py -p AlphaBetaPacmanAgent -a depth=2,evalFn=featureEvaluationFunction
+
+Distances are maze distances from the layout's DistanceTable.  With NumPy
+installed the features of a whole batch of states are computed with a few
+array operations; without it the same features are computed in plain Python.
+"""
+
+from array import array
+from util import nearestPoint
+
+try:
+    import numpy
+    _NUMPY_ENABLED = True
+except ImportError:
+    _NUMPY_ENABLED = False
+
+FEATURES = ['score', 'numFood', 'nearestFood', 'foodCentroid', 'ghostDanger', 'nearestScaredGhost']
+
+
+class LayoutArrays:
+    """
+    The parts of a layout the features are computed from: the maze distance
+    table, and where each open cell is in the food grid's bits.  Open cells
+    are numbered as in the DistanceTable.
+
+    cellDistances is the table's flat distance array and distances the same
+    as a (cells x cells) NumPy array.  In both a cell that cannot be reached
+    is numCells away, further than any cell that can.
+    """
+
+    def __init__(self, layout):
+        self.table = layout.getDistanceTable()
+        self.numCells = self.table.numCells
+        self.numBits = layout.width * layout.height
+        cellBits = [x * layout.height + y for x, y in self.table.cells]
+        self.cellDistances = self.table.distances
+        unreachable = self.table.UNREACHABLE
+        if unreachable in self.cellDistances:
+            self.cellDistances = array('H', [self.numCells if d == unreachable else d for d in self.cellDistances])
+        if _NUMPY_ENABLED:
+            self.distances = numpy.frombuffer(self.cellDistances, dtype=numpy.uint16).reshape(
+                self.numCells, self.numCells).astype(numpy.float64)
+            self.cellBits = numpy.array(cellBits, dtype=numpy.intp)
+            self.cellX = numpy.array([x for x, _ in self.table.cells], dtype=numpy.float64)
+            self.cellY = numpy.array([y for _, y in self.table.cells], dtype=numpy.float64)
+
+    def foodMasks(self, states):
+        """
+        Returns a (states x cells) boolean array marking the cells with food.
+        """
+        numBytes = (self.numBits + 7) // 8
+        packed = numpy.frombuffer(b''.join([state.data.food.bits.to_bytes(numBytes, 'little') for state in states]),
+                                  dtype=numpy.uint8).reshape(len(states), numBytes)
+        bits = numpy.unpackbits(packed, axis=1, bitorder='little')
+        return bits[:, self.cellBits].astype(bool)
+
+
+class FeatureExtractor:
+    """
+    Computes the FEATURES of game states from pacman agent index's point of
+    view:
+
+      score               the state's score for pacman index
+      numFood             the food left
+      nearestFood         maze distance to the nearest food (0 if there is none)
+      foodCentroid        manhattan distance to the mean position of the food
+      ghostDanger         1 if a ghost that is not scared is at most one step away
+      nearestScaredGhost  maze distance to the nearest scared ghost (0 if none)
+    """
+
+    def __init__(self, index=0):
+        self.index = index
+        self.layouts = {}
+
+    def layoutArrays(self, layout):
+        arrays = self.layouts.get(id(layout))
+        if arrays == None:
+            # The layout is kept alive with its arrays so that its id is not reused
+            arrays = self.layouts[id(layout)] = (LayoutArrays(layout), layout)
+        return arrays[0]
+
+    def extract(self, state):
+        """
+        Returns a dict from feature name to value for one state.
+        """
+        return dict(zip(FEATURES, self.extractRow(state)))
+
+    def extractRow(self, state):
+        """
+        Returns the features of one state in FEATURES order.  Plain Python is
+        faster than NumPy for a single state.
+        """
+        return self.extractList(state, self.layoutArrays(state.data.layout))
+
+    def extractBatch(self, states):
+        """
+        Returns the features of every state, in FEATURES order: a
+        (states x features) array with NumPy, a list of lists without.  The
+        states must share a layout.
+        """
+        if not states:
+            return []
+        arrays = self.layoutArrays(states[0].data.layout)
+        if _NUMPY_ENABLED:
+            return self.extractArrays(states, arrays)
+        return [self.extractList(state, arrays) for state in states]
+
+    def extractArrays(self, states, arrays):
+        table = arrays.table
+        index = self.index
+        numStates = len(states)
+        pacmanCells = numpy.array([table.cellIds[state.getPacmanPosition(index)] for state in states])
+        features = numpy.zeros((numStates, len(FEATURES)))
+        features[:, 0] = [state.getScore()[index] for state in states]
+
+        food = arrays.foodMasks(states)
+        numFood = food.sum(axis=1)
+        features[:, 1] = numFood
+        hasFood = numFood > 0
+        foodDistances = numpy.where(food, arrays.distances[pacmanCells], numpy.inf)
+        features[:, 2] = numpy.where(hasFood, foodDistances.min(axis=1), 0)
+        safeCount = numpy.maximum(numFood, 1)
+        centroidX = (food * arrays.cellX).sum(axis=1) / safeCount
+        centroidY = (food * arrays.cellY).sum(axis=1) / safeCount
+        pacmanX = arrays.cellX[pacmanCells]
+        pacmanY = arrays.cellY[pacmanCells]
+        features[:, 3] = numpy.where(hasFood, abs(centroidX - pacmanX) + abs(centroidY - pacmanY), 0)
+
+        ghostStates = [state.data.agentStates[state.data.numPacman:] for state in states]
+        if ghostStates[0]:
+            ghostCells = numpy.array([[table.cellIds[nearestPoint(ghost.getPosition())] for ghost in ghosts]
+                                      for ghosts in ghostStates])
+            scared = numpy.array([[ghost.scaredTimer > 0 for ghost in ghosts] for ghosts in ghostStates])
+            ghostDistances = arrays.distances[pacmanCells[:, None], ghostCells]
+            activeDistances = numpy.where(scared, numpy.inf, ghostDistances).min(axis=1)
+            features[:, 4] = activeDistances <= 1
+            scaredDistances = numpy.where(scared, ghostDistances, numpy.inf).min(axis=1)
+            features[:, 5] = numpy.where(numpy.isinf(scaredDistances), 0, scaredDistances)
+        return features
+
+    def extractList(self, state, arrays):
+        table = arrays.table
+        distances = arrays.cellDistances
+        numCells = table.numCells
+        position = state.getPacmanPosition(self.index)
+        row = table.cellIds[position] * numCells
+        cellIds = table.cellIds
+        food = state.getFoodPositions()
+
+        nearestFood = 0
+        foodCentroid = 0
+        if food:
+            nearestFood = min([distances[row + cellIds[f]] for f in food])
+            centroidX = sum([x for x, _ in food]) / float(len(food))
+            centroidY = sum([y for _, y in food]) / float(len(food))
+            foodCentroid = abs(centroidX - position[0]) + abs(centroidY - position[1])
+
+        ghostDanger = 0
+        nearestScaredGhost = None
+        for ghost in state.data.agentStates[state.data.numPacman:]:
+            distance = distances[row + cellIds[nearestPoint(ghost.getPosition())]]
+            if ghost.scaredTimer > 0:
+                if nearestScaredGhost == None or distance < nearestScaredGhost:
+                    nearestScaredGhost = distance
+            elif distance <= 1:
+                ghostDanger = 1
+        return [state.getScore()[self.index], len(food), nearestFood, foodCentroid, ghostDanger,
+                nearestScaredGhost or 0]
+
+
+class FeatureEvaluator:
+    """
+    An evaluation function that weighs the FEATURES of a state.  It is called
+    as evalFn(state, index) like the other evaluation functions, and
+    evaluateBatch(states, index) scores a list of states at once.
+    """
+    WEIGHTS = {
+        'score': 1.0,
+        'numFood': -10.0,
+        'nearestFood': -1.5,
+        'foodCentroid': -0.5,
+        'ghostDanger': -500.0,
+        'nearestScaredGhost': -2.0,
+    }
+
+    def __init__(self, weights=None):
+        weights = weights or self.WEIGHTS
+        self.weights = [weights[name] for name in FEATURES]
+        self.extractors = {}
+
+    def extractor(self, index):
+        if index not in self.extractors:
+            self.extractors[index] = FeatureExtractor(index)
+        return self.extractors[index]
+
+    def __call__(self, state, index):
+        return sum([w * f for w, f in zip(self.weights, self.extractor(index).extractRow(state))])
+
+    def evaluateBatch(self, states, index):
+        """
+        Returns the values of the states, as a list of floats.
+        """
+        features = self.extractor(index).extractBatch(states)
+        if _NUMPY_ENABLED and len(features):
+            return features.dot(self.weights).tolist()
+        return [sum([w * f for w, f in zip(self.weights, row)]) for row in features]
+
+
+featureEvaluationFunction = FeatureEvaluator()
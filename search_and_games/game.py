@@ -17,6 +17,7 @@ import time
 import os
 import traceback
 import sys
+import bisect
 
 #######################
 # Parts worth reading #
@@ -29,7 +30,14 @@ class Agent:
     following methods which will be called if they exist:
 
     def registerInitialState(self, state): # inspects the starting state
+
+    An agent that only reads the states it is given can set mutatesState to
+    False, and Game.run will then hand it the game's own state instead of a
+    copy.  Such an agent must not write to the state's data directly; the
+    GameState getters (getFood, getCapsules, getGhostStates...) return copies
+    and generateSuccessor never modifies its predecessor.
     """
+    mutatesState = True
 
     def __init__(self, index=0):
         self.index = index
@@ -198,6 +206,8 @@ class Grid:
     def __eq__(self, other):
         if other == None:
             return False
+        if isinstance(other, BitGrid):
+            return other == self
         return self.data == other.data
 
     def __hash__(self):
@@ -286,6 +296,146 @@ class Grid:
         return bools
 
 
+try:
+    _popcount = int.bit_count
+except AttributeError:
+    def _popcount(n):
+        return bin(n).count('1')
+
+
+class _BitGridColumn:
+    """
+    A view onto column x of a BitGrid, so that grid[x][y] reads and writes
+    the backing integer directly.
+    """
+    __slots__ = ('grid', 'x')
+
+    def __init__(self, grid, x):
+        self.grid = grid
+        self.x = x
+
+    def _bit(self, y):
+        height = self.grid.height
+        if y < 0:
+            y += height
+        if not 0 <= y < height:
+            raise IndexError('BitGrid column index out of range')
+        return 1 << (self.x * height + y)
+
+    def __getitem__(self, y):
+        return (self.grid.bits & self._bit(y)) != 0
+
+    def __setitem__(self, y, item):
+        if item:
+            self.grid.bits |= self._bit(y)
+        else:
+            self.grid.bits &= ~self._bit(y)
+
+    def __len__(self):
+        return self.grid.height
+
+    def __iter__(self):
+        for y in range(self.grid.height):
+            yield self[y]
+
+
+class BitGrid:
+    """
+    A 2-dimensional array of booleans backed by a single arbitrary-precision
+    integer, with the same grid[x][y] interface as Grid.
+
+    Cell (x,y) is bit number x * height + y, the same cell order used by
+    Grid.packBits, so hash(bitGrid) == hash(grid) for grids with the same
+    contents.  Since Python integers are immutable, copy() shares the backing
+    integer and a write simply rebinds it; count() is a popcount and equality
+    and hashing work on whole machine words instead of individual cells.
+    """
+
+    def __init__(self, width, height, initialValue=False, bits=0):
+        if initialValue not in [False, True]:
+            raise Exception('Grids can only contain booleans')
+        self.width = width
+        self.height = height
+        if initialValue:
+            bits = self._mask()
+        self.bits = bits
+
+    def _mask(self):
+        return (1 << (self.width * self.height)) - 1
+
+    def __getitem__(self, x):
+        if x < 0:
+            x += self.width
+        if not 0 <= x < self.width:
+            raise IndexError('BitGrid index out of range')
+        return _BitGridColumn(self, x)
+
+    def __setitem__(self, x, column):
+        for y in range(self.height):
+            self[x][y] = column[y]
+
+    def __str__(self):
+        out = [[str(self[x][y])[0] for x in range(self.width)] for y in range(self.height)]
+        out.reverse()
+        return '\n'.join([''.join(x) for x in out])
+
+    def __eq__(self, other):
+        if other == None:
+            return False
+        if not isinstance(other, BitGrid):
+            other = BitGrid.fromGrid(other)
+        return self.bits == other.bits and self.width == other.width and self.height == other.height
+
+    def __hash__(self):
+        return hash(self.bits)
+
+    def copy(self):
+        return BitGrid(self.width, self.height, bits=self.bits)
+
+    def deepCopy(self):
+        return self.copy()
+
+    def shallowCopy(self):
+        return self.copy()
+
+    def count(self, item=True):
+        trueCount = _popcount(self.bits)
+        if item:
+            return trueCount
+        return self.width * self.height - trueCount
+
+    def asList(self, key=True):
+        bits = self.bits if key else self.bits ^ self._mask()
+        list = []
+        while bits:
+            lowest = bits & -bits
+            list.append(divmod(lowest.bit_length() - 1, self.height))
+            bits ^= lowest
+        return list
+
+    def packBits(self):
+        return self.toGrid().packBits()
+
+    def toGrid(self):
+        """
+        Returns a list-of-lists Grid with the same contents.
+        """
+        g = Grid(self.width, self.height)
+        for x, y in self.asList():
+            g[x][y] = True
+        return g
+
+    def fromGrid(grid):
+        """
+        Builds a BitGrid with the same contents as the given Grid.
+        """
+        bits = 0
+        for x, y in grid.asList():
+            bits |= 1 << (x * grid.height + y)
+        return BitGrid(grid.width, grid.height, bits=bits)
+    fromGrid = staticmethod(fromGrid)
+
+
 def reconstituteGrid(bitRep):
     if type(bitRep) is not type((1, 2)):
         return bitRep
@@ -386,19 +536,88 @@ class Actions:
     getSuccessor = staticmethod(getSuccessor)
 
 
+ZOBRIST_SEED = 0x9E3779B97F4A7C15
+_ZOBRIST_MASK = (1 << 64) - 1
+
+
+class Zobrist:
+    """
+    64-bit Zobrist feature values for game states.
+
+    A state's key is the XOR of the values of its features (each agent's
+    configuration and scared timer, each remaining food pellet and capsule,
+    and each pacman's score), so it can be updated incrementally when a
+    single feature changes.  Values are a splitmix64 mix of the hash of a
+    tuple of numbers, which does not depend on PYTHONHASHSEED, so keys are
+    the same in every process.
+    """
+    DIRECTION_IDS = {Directions.NORTH: 0, Directions.SOUTH: 1, Directions.EAST: 2,
+                     Directions.WEST: 3, Directions.STOP: 4}
+
+    def value(feature):
+        z = (hash(feature) + ZOBRIST_SEED) & _ZOBRIST_MASK
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _ZOBRIST_MASK
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _ZOBRIST_MASK
+        return z ^ (z >> 31)
+    value = staticmethod(value)
+
+    def food(position):
+        return Zobrist.value((0, position[0], position[1]))
+    food = staticmethod(food)
+
+    def capsule(position):
+        return Zobrist.value((1, position[0], position[1]))
+    capsule = staticmethod(capsule)
+
+    def agent(index, agentState):
+        configuration = agentState.configuration
+        if configuration == None:
+            return Zobrist.value((2, index))
+        x, y = configuration.pos
+        direction = Zobrist.DIRECTION_IDS[configuration.direction]
+        return Zobrist.value((2, index, x, y, direction, agentState.scaredTimer))
+    agent = staticmethod(agent)
+
+    def score(index, score):
+        return Zobrist.value((3, index, score))
+    score = staticmethod(score)
+
+
 class GameStateData:
 
-    def __init__(self, prevState=None):
+    # When True, successors share every AgentState, the capsule list, the
+    # food grid and the score list with their predecessor, and only copy one
+    # of them the first time it is written (see writableAgentState and
+    # writableCapsules).  Set to False to copy everything up front.
+    copyOnWrite = True
+
+    def __init__(self, prevState=None, copyOnWrite=None):
         """
         Generates a new data packet by copying information from its predecessor.
         """
+        if copyOnWrite == None:
+            copyOnWrite = GameStateData.copyOnWrite
         if prevState != None:
-            self.food = prevState.food.shallowCopy()
-            self.capsules = prevState.capsules[:]
-            self.agentStates = self.copyAgentStates(prevState.agentStates)
+            # Shared with the predecessor until a pellet is eaten
+            self.numFood = prevState.numFood
+            self.foodPositions = prevState.foodPositions
+            if copyOnWrite:
+                self.food = prevState.food
+                self.capsules = prevState.capsules
+                self.agentStates = prevState.agentStates[:]
+                self.score = prevState.score
+                self._ownedAgentStates = [False] * len(self.agentStates)
+                self._ownsCapsules = False
+            else:
+                self.food = prevState.food.shallowCopy()
+                self.capsules = prevState.capsules[:]
+                self.agentStates = self.copyAgentStates(prevState.agentStates)
+                self.score = prevState.score.copy()
+                self._ownedAgentStates = None
+                self._ownsCapsules = True
             self.layout = prevState.layout
             self._eaten = prevState._eaten
-            self.score = prevState.score.copy()
+            self.key = prevState.key
             self.numGhosts = prevState.numGhosts
             self.numPacman = prevState.numPacman
 
@@ -410,10 +629,83 @@ class GameStateData:
         self._win = False
         self.scoreChange = [0 for _ in prevState.score] if prevState else []
 
-    def deepCopy(self):
-        state = GameStateData(self)
+    def writableAgentState(self, index):
+        """
+        Returns the AgentState for agent index, first copying it if it is
+        still shared with the predecessor.  Game rules must go through this
+        method before modifying an agent.
+        """
+        if self._ownedAgentStates != None and not self._ownedAgentStates[index]:
+            self.agentStates[index] = self.agentStates[index].copy()
+            self._ownedAgentStates[index] = True
+        return self.agentStates[index]
+
+    def writableCapsules(self):
+        """
+        Returns the capsule list, first copying it if it is still shared with
+        the predecessor.
+        """
+        if not self._ownsCapsules:
+            self.capsules = self.capsules[:]
+            self._ownsCapsules = True
+        return self.capsules
+
+    def removeFood(self, position):
+        """
+        Removes the food at position, keeping numFood and the sorted
+        foodPositions index in step with the food grid.
+        """
+        x, y = position
+        self.food = self.food.copy()
+        self.food[x][y] = False
+        self.numFood -= 1
+        i = bisect.bisect_left(self.foodPositions, position)
+        self.foodPositions = self.foodPositions[:i] + self.foodPositions[i + 1:]
+
+    def computeKey(self):
+        """
+        Computes the Zobrist key of this state from scratch.
+        """
+        key = 0
+        for index, agentState in enumerate(self.agentStates):
+            key ^= Zobrist.agent(index, agentState)
+        for position in self.foodPositions:
+            key ^= Zobrist.food(position)
+        for position in self.capsules:
+            key ^= Zobrist.capsule(position)
+        for index, score in enumerate(self.score):
+            key ^= Zobrist.score(index, score)
+        return key
+
+    def updateKey(self, prevState):
+        """
+        Updates the key inherited from prevState to account for the agents,
+        food, capsule and score that changed in this state.
+        """
+        key = self.key
+        for index, agentState in enumerate(self.agentStates):
+            prevAgentState = prevState.agentStates[index]
+            if agentState is not prevAgentState:
+                key ^= Zobrist.agent(index, prevAgentState) ^ Zobrist.agent(index, agentState)
+        if self._foodEaten != None:
+            key ^= Zobrist.food(self._foodEaten)
+        if self._capsuleEaten != None:
+            key ^= Zobrist.capsule(self._capsuleEaten)
+        if self.score is not prevState.score:
+            for index, score in enumerate(self.score):
+                if score != prevState.score[index]:
+                    key ^= Zobrist.score(index, prevState.score[index]) ^ Zobrist.score(index, score)
+        self.key = key
+
+    def deepCopy(self, copyLayout=False):
+        """
+        Copies everything that changes during a game.  The layout is shared
+        with this state unless copyLayout is set.
+        """
+        state = GameStateData(self, copyOnWrite=False)
         state.food = self.food.deepCopy()
-        state.layout = self.layout.deepCopy()
+        if copyLayout:
+            state.layout = self.layout.deepCopy()
         state._agentMoved = self._agentMoved
         state._foodEaten = self._foodEaten
         state._foodAdded = self._foodAdded
@@ -445,15 +737,10 @@ class GameStateData:
 
     def __hash__(self):
         """
-        Allows states to be keys of dictionaries.
+        Allows states to be keys of dictionaries.  Uses the Zobrist key, which
+        covers exactly the fields compared by __eq__.
         """
-        for i, state in enumerate(self.agentStates):
-            try:
-                int(hash(state))
-            except TypeError as e:
-                print(e)
-                # hash(state)
-        return int((hash(tuple(self.agentStates)) + 13*hash(self.food) + 113 * hash(tuple(self.capsules)) + 7 * hash(tuple(self.score))) % 1048575)
+        return self.key
 
     def __str__(self):
         width, height = self.layout.width, self.layout.height
@@ -509,11 +796,55 @@ class GameStateData:
             return '3'
         return 'E'
 
+    def snapshot(self):
+        """
+        Returns a compact, picklable tuple of everything in this state except
+        the layout, for sending states to other processes.  Rebuild the state
+        with GameStateData.fromSnapshot.
+        """
+        agents = tuple([(agentState.start.pos, agentState.start.direction,
+                         agentState.configuration.pos, agentState.configuration.direction,
+                         agentState.isPacman, agentState.scaredTimer) for agentState in self.agentStates])
+        return (agents, self.food.bits, tuple(self.capsules), tuple(self.score), tuple(self._eaten),
+                self._win, self._lose, self.numGhosts, self.numPacman)
+
+    def fromSnapshot(snapshot, layout):
+        """
+        Rebuilds the GameStateData that returned snapshot, given its layout.
+        """
+        agents, foodBits, capsules, score, eaten, win, lose, numGhosts, numPacman = snapshot
+        state = GameStateData()
+        state.layout = layout
+        state.food = BitGrid(layout.width, layout.height, bits=foodBits)
+        state.foodPositions = tuple(state.food.asList())
+        state.numFood = len(state.foodPositions)
+        state.capsules = list(capsules)
+        state.agentStates = []
+        for startPos, startDirection, pos, direction, isPacman, scaredTimer in agents:
+            agentState = AgentState(Configuration(startPos, startDirection), isPacman)
+            agentState.configuration = Configuration(pos, direction)
+            agentState.scaredTimer = scaredTimer
+            state.agentStates.append(agentState)
+        state._eaten = list(eaten)
+        state._ownedAgentStates = None
+        state._ownsCapsules = True
+        state.score = list(score)
+        state.scoreChange = [0] * len(score)
+        state._win = win
+        state._lose = lose
+        state.numGhosts = numGhosts
+        state.numPacman = numPacman
+        state.key = state.computeKey()
+        return state
+    fromSnapshot = staticmethod(fromSnapshot)
+
     def initialize(self, layout, numGhostAgents):
         """
         Creates an initial game state from a layout array (see layout.py).
         """
-        self.food = layout.food.copy()
+        self.food = BitGrid.fromGrid(layout.food)
+        self.foodPositions = tuple(self.food.asList())
+        self.numFood = len(self.foodPositions)
         #self.capsules = []
         self.capsules = layout.capsules[:]
         self.layout = layout
@@ -533,10 +864,13 @@ class GameStateData:
             self.agentStates.append(AgentState(
                 Configuration(pos, Directions.STOP), isPacman))
         self._eaten = [False for a in self.agentStates]
+        self._ownedAgentStates = None
+        self._ownsCapsules = True
         self.score = [0] * layout.getNumPacman()
         self.scoreChange = [0] * layout.getNumPacman()
         self.numGhosts = numGhosts
         self.numPacman = numPacman
+        self.key = self.computeKey()
 
 
 try:
@@ -551,7 +885,8 @@ class Game:
     The Game manages the control flow, soliciting actions from agents.
     """
 
-    def __init__(self, agents, display, rules, startingIndex=0, muteAgents=False, catchExceptions=False):
+    def __init__(self, agents, display, rules, startingIndex=0, muteAgents=False, catchExceptions=False,
+                 defensiveCopies=False):
         self.agentCrashed = False
         self.agents = agents
         self.display = display
@@ -560,7 +895,9 @@ class Game:
         self.gameOver = False
         self.muteAgents = muteAgents
         self.catchExceptions = catchExceptions
+        self.defensiveCopies = defensiveCopies
         self.moveHistory = []
+        self.numTurns = 0
         self.totalAgentTimes = [0 for agent in agents]
         self.totalAgentTimeWarnings = [0 for agent in agents]
         self.agentTimeout = False
@@ -581,6 +918,18 @@ class Game:
         self.agentCrashed = True
         self.rules.agentCrash(self, agentIndex)
 
+    def observe(self, agent):
+        """
+        Returns the state to hand to agent.  Agents that declare mutatesState
+        False see the game's own state; others get a copy sharing the layout.
+        With defensiveCopies every agent gets a full copy, layout included.
+        """
+        if self.defensiveCopies:
+            return self.state.deepCopy(copyLayout=True)
+        if getattr(agent, 'mutatesState', True):
+            return self.state.deepCopy()
+        return self.state
+
     OLD_STDOUT = None
     OLD_STDERR = None
 
@@ -602,9 +951,10 @@ class Game:
         sys.stdout = OLD_STDOUT
         sys.stderr = OLD_STDERR
 
-    def run(self):
+    def run(self, recordHistory=True):
         """
-        Main control loop for game play.
+        Main control loop for game play.  The moves are appended to
+        moveHistory unless recordHistory is False.
         """
         self.display.initialize(self.state.data)
         self.numMoves = 0
@@ -621,14 +971,14 @@ class Game:
                 self.unmute()
                 self._agentCrash(i, quiet=True)
                 return
-            if ("registerInitialState" in dir(agent)):
+            if hasattr(agent, 'registerInitialState'):
                 self.mute(i)
                 if self.catchExceptions:
                     try:
                         timed_func = TimeoutFunction(agent.registerInitialState, int(self.rules.getMaxStartupTime(i)))
                         try:
                             start_time = time.time()
-                            timed_func(self.state.deepCopy())
+                            timed_func(self.observe(agent))
                             time_taken = time.time() - start_time
                             self.totalAgentTimes[i] += time_taken
                         except TimeoutFunctionException:
@@ -642,7 +992,7 @@ class Game:
                         self.unmute()
                         return
                 else:
-                    agent.registerInitialState(self.state.deepCopy())
+                    agent.registerInitialState(self.observe(agent))
                 # TODO: could this exceed the total time
                 self.unmute()
 
@@ -655,14 +1005,14 @@ class Game:
             move_time = 0
             skip_action = False
             # Generate an observation of the state
-            if 'observationFunction' in dir(agent):
+            if hasattr(agent, 'observationFunction'):
                 self.mute(agentIndex)
                 if self.catchExceptions:
                     try:
                         timed_func = TimeoutFunction(agent.observationFunction, int(self.rules.getMoveTimeout(agentIndex)))
                         try:
                             start_time = time.time()
-                            observation = timed_func(self.state.deepCopy())
+                            observation = timed_func(self.observe(agent))
                         except TimeoutFunctionException:
                             skip_action = True
                         move_time += time.time() - start_time
@@ -672,10 +1022,10 @@ class Game:
                         self.unmute()
                         return
                 else:
-                    observation = agent.observationFunction(self.state.deepCopy())
+                    observation = agent.observationFunction(self.observe(agent))
                 self.unmute()
             else:
-                observation = self.state.deepCopy()
+                observation = self.observe(agent)
 
             # Solicit an action
             action = None
@@ -725,7 +1075,9 @@ class Game:
             self.unmute()
 
             # Execute the action
-            self.moveHistory.append((agentIndex, action))
+            if recordHistory:
+                self.moveHistory.append((agentIndex, action))
+            self.numTurns += 1
             if self.catchExceptions:
                 try:
                     self.state = self.state.generateSuccessor( agentIndex, action )
@@ -755,7 +1107,7 @@ class Game:
 
         # inform a learning agent of the game result
         for agentIndex, agent in enumerate(self.agents):
-            if "final" in dir(agent):
+            if hasattr(agent, 'final'):
                 try:
                     self.mute(agentIndex)
                     agent.final(self.state)
@@ -21,6 +21,8 @@ class KeyboardAgent(Agent):
     """
     An agent controlled by the keyboard.
     """
+    mutatesState = False
+
     # NOTE: Arrow keys also work.
     WEST_KEY = 'a'
     EAST_KEY = 'd'
@@ -13,17 +13,30 @@
 
 
 from util import manhattanDistance
-from game import Grid
+from game import Grid, Directions
+from array import array
+from collections import deque
+import hashlib
 import os
+import pickle
 import random
+import threading
 from functools import reduce
 
 VISIBILITY_MATRIX_CACHE = {}
 
+# Set to keep pre-parsed layouts in a __cache__ directory next to the .lay files
+USE_DISK_CACHE = False
+DISK_CACHE_DIR = '__cache__'
+
 
 class Layout:
     """
     A Layout manages the static information about the game board.
+
+    Layouts returned by getLayout and internLayout are shared by every game
+    and state in the process, so they must not be modified; use deepCopy to
+    get a private one.
     """
 
     def __init__(self, layoutText):
@@ -38,6 +51,7 @@ class Layout:
         self.processLayoutText(layoutText)
         self.layoutText = layoutText
         self.totalFood = len(self.food.asList())
+        self.distanceTable = None
         # self.initializeVisibilityMatrix()
 
     def getNumGhosts(self):
@@ -95,8 +109,36 @@ class Layout:
     def __str__(self):
         return "\n".join(self.layoutText)
 
+    def getDistanceTable(self):
+        """
+        Returns the DistanceTable of this layout, building it (or loading it
+        from the disk cache) on first use.
+        """
+        if getattr(self, 'distanceTable', None) == None:
+            self.distanceTable = DistanceTable.forLayout(self)
+        return self.distanceTable
+
+    def __getstate__(self):
+        # Distance tables are rebuilt rather than pickled with games and layouts
+        state = self.__dict__.copy()
+        state['distanceTable'] = None
+        return state
+
+    def key(self):
+        """
+        A hash of the layout text, identifying layouts with the same maze.
+        """
+        return layoutKey(self.layoutText)
+
     def deepCopy(self):
-        return Layout(self.layoutText[:])
+        layout = Layout.__new__(Layout)
+        layout.__dict__.update(self.__dict__)
+        layout.walls = self.walls.deepCopy()
+        layout.food = self.food.deepCopy()
+        layout.capsules = self.capsules[:]
+        layout.agentPositions = self.agentPositions[:]
+        layout.layoutText = self.layoutText[:]
+        return layout
 
     def processLayoutText(self, layoutText):
         """
@@ -137,28 +179,246 @@ class Layout:
             self.numGhosts += 1
 
 
-def getLayout(name, back=2):
-    if name.endswith('.lay'):
-        layout = tryToLoad('layouts/' + name)
-        if layout == None:
-            layout = tryToLoad(name)
-    else:
-        layout = tryToLoad('layouts/' + name + '.lay')
+class DistanceTable:
+    """
+    The maze distance between every pair of open cells of a layout.
+
+    Open cells are numbered column by column, and the distances from each
+    cell, found by a breadth first search, are stored in one flat array, so
+    distance and nextStep take constant time.  Positions must be grid points.
+    """
+    UNREACHABLE = 0xFFFF
+    MOVES = [(Directions.NORTH, (0, 1)), (Directions.SOUTH, (0, -1)),
+             (Directions.EAST, (1, 0)), (Directions.WEST, (-1, 0))]
+
+    def __init__(self, walls, distances=None):
+        self.cellIds = {}
+        self.cells = []
+        for x in range(walls.width):
+            for y in range(walls.height):
+                if not walls[x][y]:
+                    self.cellIds[(x, y)] = len(self.cells)
+                    self.cells.append((x, y))
+        # moves[id] lists the (action, neighbor id) pairs out of cell id
+        self.moves = []
+        for x, y in self.cells:
+            self.moves.append([(action, self.cellIds[(x + dx, y + dy)]) for action, (dx, dy) in self.MOVES
+                               if (x + dx, y + dy) in self.cellIds])
+        self.numCells = len(self.cells)
+        if distances == None:
+            distances = self.computeDistances()
+        self.distances = distances
+
+    def computeDistances(self):
+        numCells = self.numCells
+        distances = array('H', [self.UNREACHABLE]) * (numCells * numCells)
+        neighbors = [[neighbor for _, neighbor in moves] for moves in self.moves]
+        for source in range(numCells):
+            row = source * numCells
+            distances[row + source] = 0
+            queue = deque([source])
+            while queue:
+                cell = queue.popleft()
+                nextDistance = distances[row + cell] + 1
+                for neighbor in neighbors[cell]:
+                    if distances[row + neighbor] == self.UNREACHABLE:
+                        distances[row + neighbor] = nextDistance
+                        queue.append(neighbor)
+        return distances
+
+    def distance(self, a, b):
+        """
+        Returns the length of the shortest path between positions a and b, or
+        None if there is none.
+        """
+        d = self.distances[self.cellIds[a] * self.numCells + self.cellIds[b]]
+        if d == self.UNREACHABLE:
+            return None
+        return d
+
+    def nextStep(self, a, b):
+        """
+        Returns the action that takes one step from a along a shortest path to
+        b: Directions.STOP if a is b, None if b cannot be reached.
+        """
+        source = self.cellIds[a]
+        target = self.cellIds[b]
+        numCells = self.numCells
+        d = self.distances[source * numCells + target]
+        if d == 0:
+            return Directions.STOP
+        if d == self.UNREACHABLE:
+            return None
+        for action, neighbor in self.moves[source]:
+            if self.distances[neighbor * numCells + target] == d - 1:
+                return action
+
+    @staticmethod
+    def forLayout(layout):
+        """
+        Builds the table of a layout, going through the disk cache when
+        USE_DISK_CACHE is set.
+        """
+        if not USE_DISK_CACHE:
+            return DistanceTable(layout.walls)
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'layouts', DISK_CACHE_DIR,
+                            layout.key() + '.distances')
+        table = DistanceTable(layout.walls, distances=array('H'))
+        try:
+            f = open(path, 'rb')
+            try:
+                table.distances.fromfile(f, table.numCells * table.numCells)
+            finally:
+                f.close()
+            return table
+        except (IOError, EOFError):
+            pass
+        table.distances = table.computeDistances()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tempPath = '%s.%d' % (path, os.getpid())
+            f = open(tempPath, 'wb')
+            try:
+                table.distances.tofile(f)
+            finally:
+                f.close()
+            os.replace(tempPath, path)
+        except OSError:
+            pass
+        return table
+
+
+class LayoutRegistry:
+    """
+    A process-wide registry of parsed layouts.
+
+    Layouts are interned by the hash of their text, so each distinct maze is
+    parsed once and the same Layout is returned to every caller, and files
+    are remembered by path.  The registry is safe to use from several
+    threads.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.byKey = {}
+        self.byPath = {}
+
+    def intern(self, layoutText):
+        key = layoutKey(layoutText)
+        with self.lock:
+            layout = self.byKey.get(key)
+            if layout == None:
+                layout = self.byKey[key] = Layout(layoutText)
+            return layout
+
+    def load(self, path):
+        path = os.path.abspath(path)
+        with self.lock:
+            layout = self.byPath.get(path)
+        if layout != None:
+            return layout
+        layout = loadCachedLayout(path) if USE_DISK_CACHE else None
         if layout == None:
-            layout = tryToLoad(name + '.lay')
-    if layout == None and back >= 0:
-        curdir = os.path.abspath('.')
-        os.chdir('..')
-        layout = getLayout(name, back - 1)
-        os.chdir(curdir)
-    return layout
+            f = open(path)
+            try:
+                layout = self.intern([line.strip() for line in f])
+            finally:
+                f.close()
+            if USE_DISK_CACHE:
+                saveCachedLayout(path, layout)
+        else:
+            with self.lock:
+                layout = self.byKey.setdefault(layout.key(), layout)
+        with self.lock:
+            return self.byPath.setdefault(path, layout)
+
+    def clear(self):
+        with self.lock:
+            self.byKey.clear()
+            self.byPath.clear()
+
+
+REGISTRY = LayoutRegistry()
+
+
+def layoutKey(layoutText):
+    return hashlib.sha1('\n'.join(layoutText).encode()).hexdigest()
+
+
+def internLayout(layoutText):
+    """
+    Returns the shared Layout for the given lines of layout text.
+    """
+    return REGISTRY.intern(layoutText)
+
+
+def findLayout(name, back=2):
+    """
+    Returns the path of the layout file called name (with or without .lay),
+    looking in layouts/ and in the directory itself, starting from the working
+    directory and going up back + 1 parent directories.  Returns None if there
+    is no such file.
+    """
+    if not name.endswith('.lay'):
+        name = name + '.lay'
+    directory = os.path.abspath('.')
+    for level in range(back + 2):
+        for path in [os.path.join(directory, 'layouts', name), os.path.join(directory, name)]:
+            if os.path.exists(path):
+                return path
+        directory = os.path.dirname(directory)
+    return None
+
+
+def getLayout(name, back=2):
+    path = findLayout(name, back)
+    if path == None:
+        return None
+    return REGISTRY.load(path)
 
 
 def tryToLoad(fullname):
     if(not os.path.exists(fullname)):
         return None
-    f = open(fullname)
+    return REGISTRY.load(fullname)
+
+
+def cachedLayoutPath(path):
+    directory, name = os.path.split(path)
+    return os.path.join(directory, DISK_CACHE_DIR, name + '.pickle')
+
+
+def loadCachedLayout(path):
+    """
+    Returns the pre-parsed layout saved for the .lay file at path, or None if
+    there is none or the file has changed since it was saved.
+    """
+    try:
+        f = open(cachedLayoutPath(path), 'rb')
+    except IOError:
+        return None
     try:
-        return Layout([line.strip() for line in f])
+        stamp, layout = pickle.load(f)
+    except Exception:
+        return None
     finally:
         f.close()
+    if stamp != os.stat(path).st_mtime_ns:
+        return None
+    return layout
+
+
+def saveCachedLayout(path, layout):
+    cachePath = cachedLayoutPath(path)
+    try:
+        os.makedirs(os.path.dirname(cachePath), exist_ok=True)
+        # Write then rename so that concurrent readers never see half a file
+        tempPath = '%s.%d' % (cachePath, os.getpid())
+        f = open(tempPath, 'wb')
+        try:
+            pickle.dump((os.stat(path).st_mtime_ns, layout), f, pickle.HIGHEST_PROTOCOL)
+        finally:
+            f.close()
+        os.replace(tempPath, cachePath)
+    except OSError:
+        pass  # The cache is only an optimization; read-only layout directories are fine
@@ -10,6 +10,7 @@
 # (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
 # Student side autograding was added by Brad Miller, Nick Hay, and
 # Pieter Abbeel (pabbeel@cs.berkeley.edu).
+from collections import OrderedDict
 from math import floor
 
 from util import manhattanDistance
@@ -17,6 +18,11 @@ from game import Directions
 import random, util, time
 
 from game import Agent
+from pacman import GameState, RolloutState
+from features import featureEvaluationFunction
+from concurrent.futures import ProcessPoolExecutor
+import math
+import os
 
 
 class ReflexAgent(Agent):
@@ -28,6 +34,7 @@ class ReflexAgent(Agent):
     it in any way you see fit, so long as you don't touch our method
     headers.
     """
+    mutatesState = False
 
     def getAction(self, gameState):
         """
@@ -66,11 +73,11 @@ class ReflexAgent(Agent):
         # Useful information you can extract from a GameState (pacman.py)
         successorGameState = currentGameState.generatePacmanSuccessor(self.index, action)
         newPos = successorGameState.getPacmanPosition(self.index)
-        newFood = successorGameState.getFood()
+        newFood = successorGameState.getFoodPositions()
         newGhostStates = successorGameState.getGhostStates()
 
-        if len(newFood.asList()):
-            fooddist = util.manhattanDistance(newPos, newFood.asList()[0])
+        if len(newFood):
+            fooddist = util.manhattanDistance(newPos, newFood[0])
         else:
             fooddist = 0
 
@@ -87,11 +94,11 @@ def scoreEvaluationFunction(currentGameState, index):
     """
     # Useful information you can extract from a GameState (pacman.py)
     newPos = currentGameState.getPacmanPosition(index)
-    newFood = currentGameState.getFood()
+    newFood = currentGameState.getFoodPositions()
     newGhostPositions = currentGameState.getGhostPositions()
 
-    if len(newFood.asList()):
-        fooddist = util.manhattanDistance(newPos, newFood.asList()[0])
+    if len(newFood):
+        fooddist = util.manhattanDistance(newPos, newFood[0])
     else:
         fooddist = 0
 
@@ -101,21 +108,148 @@ def scoreEvaluationFunction(currentGameState, index):
         newGhostDistances.append(ghostDist)
     minGhostDist = min(newGhostDistances)
     # need to incentivize moving toward the average food area
-    print(minGhostDist)
-    print(fooddist)
     return currentGameState.getScore()[index] - 20 * fooddist + 30 * minGhostDist
 
 
+def heuristicEvaluationFunction(currentGameState, index):
+    """
+    The evaluation used by MultiPacmanAgent and its subclasses by default:
+    the score minus the manhattan distance to the first food.
+    """
+    position = currentGameState.getPacmanPosition(index)
+    food = currentGameState.getFoodPositions()
+
+    food_dist = 0.001
+    if len(food):
+        food_dist = util.manhattanDistance(position, food[0])
+
+    score = currentGameState.getScore()[index]
+    if score == 0:
+        score = 0.001
+    return score - food_dist
+
+
+class TranspositionTable:
+    """
+    A bounded cache of search results keyed by (state key, agent index,
+    remaining depth).  Subclasses decide which entry to give up when the
+    table is full.
+
+    hits, misses and evictions count lookups that found an entry, lookups
+    that did not, and stored entries that were dropped to make room.
+    """
+
+    def __init__(self, maxSize=100000):
+        self.maxSize = int(maxSize)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, key):
+        "Returns the entry stored under key, or None"
+        util.raiseNotDefined()
+
+    def store(self, key, depth, entry):
+        "Stores entry, the result of a search with the given remaining depth, under key"
+        util.raiseNotDefined()
+
+    def clear(self):
+        util.raiseNotDefined()
+
+    def __len__(self):
+        util.raiseNotDefined()
+
+    def __str__(self):
+        return '%d entries, %d hits, %d misses, %d evictions' % (len(self), self.hits, self.misses, self.evictions)
+
+
+class LRUTranspositionTable(TranspositionTable):
+    "A transposition table that evicts the least recently used entry when full."
+
+    def __init__(self, maxSize=100000):
+        TranspositionTable.__init__(self, maxSize)
+        self.entries = OrderedDict()
+
+    def lookup(self, key):
+        entry = self.entries.get(key)
+        if entry == None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return entry
+
+    def store(self, key, depth, entry):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+        elif len(self.entries) >= self.maxSize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        self.entries[key] = entry
+
+    def clear(self):
+        self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class DepthPreferredTranspositionTable(TranspositionTable):
+    """
+    A fixed-size transposition table in which each key maps to a single slot.
+    When two keys collide, the result of the deeper search is kept.
+    """
+
+    def __init__(self, maxSize=100000):
+        TranspositionTable.__init__(self, maxSize)
+        self.slots = [None] * self.maxSize
+        self.size = 0
+
+    def lookup(self, key):
+        slot = self.slots[hash(key) % self.maxSize]
+        if slot != None and slot[0] == key:
+            self.hits += 1
+            return slot[2]
+        self.misses += 1
+        return None
+
+    def store(self, key, depth, entry):
+        index = hash(key) % self.maxSize
+        slot = self.slots[index]
+        if slot == None:
+            self.size += 1
+        elif slot[0] != key:
+            if slot[1] > depth:
+                return
+            self.evictions += 1
+        self.slots[index] = (key, depth, entry)
+
+    def clear(self):
+        self.slots = [None] * self.maxSize
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+
+TRANSPOSITION_TABLES = {
+    'lru': LRUTranspositionTable,
+    'depth': DepthPreferredTranspositionTable,
+}
+
+
 class MultiAgentSearchAgent(Agent):
     """
     This class provides some common elements to all of your
     multi-agent searchers.  Any methods defined here will be available
     to the MinimaxPacmanAgent.
     """
+    mutatesState = False
 
     def __init__(self, index=0, evalFn='scoreEvaluationFunction', depth='3'):
         self.index = index  # Pacman is always agent index 0
-        self.evaluationFunction = lambda state: util.lookup(evalFn, globals())(state, self.index)
+        evaluate = util.lookup(evalFn, globals())
+        self.evaluationFunction = lambda state: evaluate(state, self.index)
         self.depth = int(depth)
 
 
@@ -125,8 +259,53 @@ class MultiPacmanAgent(MultiAgentSearchAgent):
 
     We recursively check for the optimal solution for pacman, assuming
     that ghost agents move randomly
+
+    Pass tt=lru or tt=depth (and optionally ttSize=N) to cache subtree results
+    in a TranspositionTable that is kept for the rest of the game, e.g.
+    python pacman.py -p MultiPacmanAgent -a depth=3,tt=lru,ttSize=200000
+
+    States at the depth limit are scored by evalFn, e.g.
+    python pacman.py -p MultiPacmanAgent -a depth=2,evalFn=featureEvaluationFunction
+
+    The last batch plies above the depth limit are generated in one go and
+    all their leaves scored by a single call to evalFn.evaluateBatch(states,
+    index), falling back to one evalFn call per leaf for evaluation functions
+    without it.  By default the last round of moves is batched when evalFn
+    has evaluateBatch, and nothing otherwise; batch=0 turns batching off.
+    Batched subtrees are backed up by the same rules as expand, so
+    subclasses with chance nodes describe them through chanceOutcomes.
     """
 
+    def __init__(self, index=0, evalFn='heuristicEvaluationFunction', depth='3', tt=None, ttSize='100000',
+                 batch=None):
+        MultiAgentSearchAgent.__init__(self, index, evalFn, depth)
+        evaluate = util.lookup(evalFn, globals())
+        if hasattr(evaluate, 'evaluateBatch'):
+            self.batchEvaluationFunction = lambda states: evaluate.evaluateBatch(states, self.index)
+        else:
+            self.batchEvaluationFunction = lambda states: [self.evaluationFunction(state) for state in states]
+        if batch == None:
+            self.batchPlies = None if hasattr(evaluate, 'evaluateBatch') else 0
+        else:
+            self.batchPlies = int(batch)
+        self.leavesEvaluated = 0
+        self.batchesEvaluated = 0
+        if tt == None:
+            self.transpositionTable = None
+        elif tt in TRANSPOSITION_TABLES:
+            self.transpositionTable = TRANSPOSITION_TABLES[tt](ttSize)
+        else:
+            raise Exception('Unknown transposition table ' + str(tt) + '; choose from ' +
+                            ', '.join(sorted(TRANSPOSITION_TABLES.keys())))
+        self.nodesExpanded = 0
+
+    def registerInitialState(self, gameState):
+        """
+        Starts every game with an empty transposition table
+        """
+        if self.transpositionTable != None:
+            self.transpositionTable.clear()
+
     def getAction(self, gameState):
         """
         Returns the minimax action using self.depth and self.evaluationFunction
@@ -143,6 +322,28 @@ class MultiPacmanAgent(MultiAgentSearchAgent):
         agentIndex: index of the current agent (0 for pacman, 1, 2, ... for each ghost)
         depth: depth of the current (prospective) game, i.e. number of moves forward we're looking
 
+        The base cases for the recursion are handled by leafScore
+        """
+        leaf_score = self.leafScore(game_state, depth)
+        if leaf_score != None:
+            return None, leaf_score
+        # Else continue recursively with the available moves
+        else:
+            if self.transpositionTable == None:
+                return self.expand(game_state=game_state, agent_index=agent_index, depth=depth)
+            # identical positions reached by different move orders are only searched once
+            remaining_depth = self.depth - depth
+            table_key = (game_state.key(), agent_index, remaining_depth)
+            entry = self.transpositionTable.lookup(table_key)
+            if entry == None:
+                entry = self.expand(game_state=game_state, agent_index=agent_index, depth=depth)
+                self.transpositionTable.store(table_key, remaining_depth, entry)
+            return entry
+
+    def leafScore(self, game_state, depth):
+        """
+        Returns the score of game_state if it is a base case of the recursion, or None otherwise
+
         The base cases for the recursion
             1. We have reached the specified max depth (return score)
             2. We are playing pacman and have reached a winning game state (return score + incentive)
@@ -150,87 +351,790 @@ class MultiPacmanAgent(MultiAgentSearchAgent):
             3. We are playing pacman and have reached a losing game state (return score - incentive)
                and there are no more states to explore
         """
-
-        position = game_state.getPacmanPosition(0)
-        food = game_state.getFood()
-
-        food_dist = 0.001
-        score = 0
-        if len(food.asList()):
-            food_dist = util.manhattanDistance(position, food.asList()[0])
-
-        score = game_state.getScore()[0]
-        if score == 0:
-            score = 0.001
-        prospective_score = score - food_dist
-
         # Base case #1: max depth reached
         if depth == self.depth:
-            return None, prospective_score
+            self.leavesEvaluated += 1
+            self.batchesEvaluated += 1
+            return self.heuristicScore(game_state)
         # Base case #2: pacman moves to winning game state
         elif game_state.isWin():
-            return None, 10000
+            return 10000
         # Base case #3: pacman moves to winning game state
         elif game_state.isLose():
-            return None, -10000
-        # Else continue recursively with the available moves
+            return -10000
+        return None
+
+    def heuristicScore(self, game_state):
+        """
+        The score of a state at the depth limit, given by the evaluation function
+        """
+        return self.evaluationFunction(game_state)
+
+    def expand(self, game_state, agent_index, depth):
+        """
+        The recursive step of minimax for a non-terminal state above the depth limit:
+        scores every legal move of agent_index and returns (best move, best score)
+        """
+        num_agents = game_state.getNumAgents()
+        batch_plies = num_agents if self.batchPlies == None else self.batchPlies
+        if (self.depth - depth) * num_agents - agent_index <= batch_plies:
+            return self.expandBatch(game_state, agent_index, depth)
+        self.nodesExpanded += 1
+        # get all legal moves for this game state
+        prospective_moves = game_state.getLegalActions(agent_index)
+        prospective_scores = list()
+
+        if agent_index == 0:
+            # agent index = 0 -> the current move is as the pacman agent
+            # find max of potential moves recursively
+            max_score = -9999999
+            max_score_move = None
+
+            for move in prospective_moves:
+                next_agent = agent_index + 1
+                next_depth = depth
+
+                if next_agent == game_state.getNumAgents():
+                    next_agent = 0
+                    next_depth = depth + 1
+
+                prospective_state = game_state.generatePacmanSuccessor(0, move)
+                _, prospective_score = self.minimax(game_state=prospective_state, agent_index=next_agent,
+                                                    depth=next_depth)
+                if prospective_score > max_score:
+                    max_score = prospective_score
+                    max_score_move = move
+                prospective_scores.append(prospective_score)
+
+            max_score_moves = list()
+            for move, score in zip(prospective_moves, prospective_scores):
+                if score == max_score:
+                    max_score_moves.append(move)
+            # after finding all potential move scores & max one, return the max
+            return random.choice(max_score_moves), max_score
         else:
-            # get all legal moves for this game state
-            prospective_moves = game_state.getLegalActions(agent_index)
-            prospective_scores = list()
-
-            if agent_index == 0:
-                # agent index = 0 -> the current move is as the pacman agent
-                # find max of potential moves recursively
-                max_score = -9999999
-                max_score_move = None
-
-                for move in prospective_moves:
-                    next_agent = agent_index + 1
-                    next_depth = depth
-
-                    if next_agent == game_state.getNumAgents():
-                        next_agent = 0
-                        next_depth = depth + 1
-
-                    prospective_state = game_state.generatePacmanSuccessor(0, move)
-                    _, prospective_score = self.minimax(game_state=prospective_state, agent_index=next_agent,
-                                                        depth=next_depth)
-                    if prospective_score > max_score:
-                        max_score = prospective_score
-                        max_score_move = move
-                    prospective_scores.append(prospective_score)
-
-                max_score_moves = list()
-                for move, score in zip(prospective_moves, prospective_scores):
-                    if score == max_score:
-                        max_score_moves.append(move)
-                # after finding all potential move scores & max one, return the max
-                return random.choice(max_score_moves), max_score
+            # find min of potential moves recursively
+            min_score = 9999999
+            min_score_move = None
+
+            for move in prospective_moves:
+                next_agent = agent_index + 1    # move to next agent
+                next_depth = depth              # keep depth unless we are currently the last agent
+
+                if next_agent == game_state.getNumAgents():
+                    next_agent = 0          # if we are currently last ghost, set agent to pacman
+                    next_depth = depth + 1  # also increase depth, as we have calculated next move for all agents
+
+                # generate next state and get score
+                prospective_state = game_state.generateSuccessor(agent_index, move)
+                _, prospective_score = self.minimax(game_state=prospective_state, agent_index=next_agent,
+                                                    depth=next_depth)
+                # if next score less than current min, set new min and move that led to it
+                if prospective_score < min_score:
+                    min_score = prospective_score
+                    min_score_move = move
+                prospective_scores.append(prospective_score)
+            # after finding all potential move scores & min one, return the min
+            return min_score_move, min_score
+
+
+    def chanceOutcomes(self, game_state, agent_index):
+        """
+        Returns the (move, probability) pairs of agent_index's moves when it
+        is a chance node, or None when it minimizes, as every ghost does here
+        """
+        return None
+
+    def expandBatch(self, game_state, agent_index, depth):
+        """
+        Like expand, but generates the whole subtree down to the depth limit
+        first and scores its leaves with one call to the batch evaluation function
+        """
+        leaves = list()
+        tree = self.buildSubtree(game_state, agent_index, depth, game_state.getNumAgents(), leaves)
+        scores = self.batchEvaluationFunction(leaves)
+        self.leavesEvaluated += len(leaves)
+        self.batchesEvaluated += 1
+        return self.backUp(tree, scores)
+
+    def buildSubtree(self, game_state, agent_index, depth, num_agents, leaves):
+        """
+        Returns the subtree under game_state as nested tuples: ('leaf', i) for the
+        i-th state of leaves, which is waiting to be scored, ('score', score) for
+        a won or lost state, and ('node', agent_index, moves, probabilities,
+        subtrees) otherwise, where probabilities is None unless the node is a
+        chance node
+        """
+        if depth == self.depth:
+            leaves.append(game_state)
+            return 'leaf', len(leaves) - 1
+        elif game_state.isWin():
+            return 'score', 10000
+        elif game_state.isLose():
+            return 'score', -10000
+        self.nodesExpanded += 1
+        next_agent = agent_index + 1
+        next_depth = depth
+        if next_agent == num_agents:
+            next_agent = 0
+            next_depth = depth + 1
+        moves = game_state.getLegalActions(agent_index)
+        probabilities = None
+        if agent_index != 0:
+            outcomes = self.chanceOutcomes(game_state, agent_index)
+            if outcomes != None:
+                if not outcomes:
+                    # A chance node without outcomes is scored like a leaf
+                    leaves.append(game_state)
+                    return 'leaf', len(leaves) - 1
+                moves = [move for move, _ in outcomes]
+                probabilities = [p for _, p in outcomes]
+        subtrees = [self.buildSubtree(game_state.generateSuccessor(agent_index, move), next_agent, next_depth,
+                                      num_agents, leaves) for move in moves]
+        return 'node', agent_index, moves, probabilities, subtrees
+
+    def backUp(self, tree, scores):
+        """
+        Returns (best move, best score) of a subtree from buildSubtree, choosing
+        between moves as expand does; chance nodes return (None, expected score)
+        """
+        _, agent_index, moves, probabilities, subtrees = tree
+        prospective_scores = list()
+        for subtree in subtrees:
+            if subtree[0] == 'leaf':
+                prospective_scores.append(scores[subtree[1]])
+            elif subtree[0] == 'score':
+                prospective_scores.append(subtree[1])
             else:
-                # find min of potential moves recursively
-                min_score = 9999999
-                min_score_move = None
+                prospective_scores.append(self.backUp(subtree, scores)[1])
+
+        if agent_index == 0:
+            max_score = max([-9999999] + prospective_scores)
+            max_score_moves = [move for move, score in zip(moves, prospective_scores) if score == max_score]
+            return random.choice(max_score_moves), max_score
+        if probabilities != None:
+            expected_score = 0
+            for p, score in zip(probabilities, prospective_scores):
+                expected_score += p * score
+            return None, expected_score
+        min_score = 9999999
+        min_score_move = None
+        for move, score in zip(moves, prospective_scores):
+            if score < min_score:
+                min_score = score
+                min_score_move = move
+        return min_score_move, min_score
+
+
+_workerLayout = None
+_workerAgent = None
+
+
+def _initSearchWorker(layoutText, agentClassName, agentArgs):
+    """
+    Runs once in each worker process of a ParallelMultiPacmanAgent: parses the
+    layout and builds the agent that searches the subtrees sent to this worker.
+    """
+    global _workerLayout, _workerAgent
+    import layout
+    _workerLayout = layout.internLayout(layoutText)
+    _workerAgent = globals()[agentClassName](**agentArgs)
+
+
+def _searchSubtree(snapshot, agent_index, action):
+    """
+    Returns (score, nodes expanded) of the subtree reached when agent_index plays
+    action in the snapshotted state, searched by the worker's agent.
+    """
+    game_state = GameState.fromSnapshot(snapshot, _workerLayout)
+    next_agent = agent_index + 1
+    next_depth = 0
+    if next_agent == game_state.getNumAgents():
+        next_agent = 0
+        next_depth = 1
+    _workerAgent.nodesExpanded = 0
+    prospective_state = game_state.generateSuccessor(agent_index, action)
+    _, score = _workerAgent.minimax(game_state=prospective_state, agent_index=next_agent, depth=next_depth)
+    return score, _workerAgent.nodesExpanded
+
+
+class ParallelMultiPacmanAgent(MultiPacmanAgent):
+    """
+    Minimax with root splitting: the subtree of every root action is searched
+    by its own MultiPacmanAgent in a pool of worker processes, and the root takes
+    the argmax of their scores.
+
+    Workers receive the layout once, when the pool starts, and then only a
+    GameState.snapshot() per root action.  The pool is kept for as long as
+    the maze stays the same (copies of the layout, e.g. with
+    --defensiveCopies, are the same maze), and poolsStarted counts the pools
+    started.  workers=N sets the pool size (0, the default, means one per
+    CPU), e.g.
+    python pacman.py -p ParallelMultiPacmanAgent -a depth=4,workers=8
+    """
+
+    def __init__(self, index=0, evalFn='heuristicEvaluationFunction', depth='3', tt=None, ttSize='100000',
+                 workers='0', batch=None):
+        MultiPacmanAgent.__init__(self, index, evalFn, depth, tt, ttSize, batch)
+        self.workers = int(workers) or os.cpu_count() or 1
+        self.workerArgs = {'evalFn': evalFn, 'depth': depth, 'tt': tt, 'ttSize': ttSize, 'batch': batch}
+        self.pool = None
+        self.poolLayout = None
+        self.poolKey = None
+        self.poolsStarted = 0
+
+    def getPool(self, layout):
+        "Returns a worker pool for layout, restarting it if the maze changed"
+        if self.pool != None and self.poolLayout is not layout and layout.key() == self.poolKey:
+            self.poolLayout = layout
+        if self.pool == None or self.poolLayout is not layout:
+            self.shutdown()
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_initSearchWorker,
+                                            initargs=(layout.layoutText, 'MultiPacmanAgent', self.workerArgs))
+            self.poolLayout = layout
+            self.poolKey = layout.key()
+            self.poolsStarted += 1
+        return self.pool
+
+    def shutdown(self):
+        if self.pool != None:
+            self.pool.shutdown()
+            self.pool = None
+            self.poolLayout = None
+            self.poolKey = None
+
+    def final(self, gameState):
+        self.shutdown()
+
+    def getAction(self, gameState):
+        """
+        Returns the minimax action, searching the root actions in parallel
+        """
+        prospective_moves = gameState.getLegalActions(self.index)
+        pool = self.getPool(gameState.data.layout)
+        snapshot = gameState.snapshot()
+        futures = [pool.submit(_searchSubtree, snapshot, self.index, move) for move in prospective_moves]
+        prospective_scores = list()
+        for future in futures:
+            score, nodes = future.result()
+            prospective_scores.append(score)
+            self.nodesExpanded += nodes
+        self.nodesExpanded += 1
+        max_score = max(prospective_scores)
+        max_score_moves = [move for move, score in zip(prospective_moves, prospective_scores) if score == max_score]
+        return random.choice(max_score_moves)
+
+
+def makeGhostPolicy(agentIndex, numPacman, ghostType='RandomGhost'):
+    """
+    Returns an agent modelling how agent agentIndex moves when the real ghost
+    agents of the game are not known: a ghostType agent from ghostAgents.py for
+    ghosts, and a uniformly random one for other pacmen.
+    """
+    import ghostAgents
+    if agentIndex < numPacman:
+        return ghostAgents.RandomGhost(agentIndex)
+    return getattr(ghostAgents, ghostType)(agentIndex)
+
+
+class ExpectimaxPacmanAgent(MultiPacmanAgent):
+    """
+    An expectimax agent: pacman maximizes, and every other agent is a chance
+    node whose children are weighted by that agent's own policy.
+
+    Ghost policies come from the ghost agents of the game (through
+    setGhostAgents); outside a game, ghosts are modelled with the ghostAgents
+    class named by the ghost argument.  Other pacmen move uniformly at random.
+
+    With samples=N, a chance node with more than N outcomes is estimated
+    from N moves sampled from the policy instead of searching every outcome,
+    e.g.  python pacman.py -p ExpectimaxPacmanAgent -a depth=4,samples=1
+
+    The batch argument works as for MultiPacmanAgent; batched chance nodes
+    are averaged over the same policies.
+    """
+
+    def __init__(self, index=0, evalFn='heuristicEvaluationFunction', depth='3', tt=None, ttSize='100000',
+                 samples=None, ghost='RandomGhost', batch=None):
+        MultiPacmanAgent.__init__(self, index, evalFn, depth, tt, ttSize, batch)
+        self.samples = None if samples == None else int(samples)
+        self.ghostType = ghost
+        self.policies = {}
+
+    def setGhostAgents(self, ghostAgents):
+        "Called by the game rules with the ghost agents playing this game"
+        self.policies = dict([(ghost.index, ghost) for ghost in ghostAgents])
+
+    def getPolicy(self, game_state, agent_index):
+        "Returns the agent whose getDistribution gives agent_index's chance weights"
+        if agent_index not in self.policies:
+            self.policies[agent_index] = makeGhostPolicy(agent_index, game_state.getNumPacman(), self.ghostType)
+        return self.policies[agent_index]
+
+    def chanceOutcomes(self, game_state, agent_index):
+        """
+        Returns the moves of agent_index with their probabilities under its
+        policy, or a sample of them when there are more than self.samples
+        """
+        distribution = self.getPolicy(game_state, agent_index).getDistribution(game_state)
+        outcomes = [(move, p) for move, p in distribution.items() if p > 0]
+        if self.samples != None and len(outcomes) > self.samples:
+            # sparse sampling: average over moves drawn from the policy
+            draws = util.Counter()
+            for _ in range(self.samples):
+                draws[util.sample(distribution)] += 1.0 / self.samples
+            outcomes = list(draws.items())
+        return outcomes
+
+    def expand(self, game_state, agent_index, depth):
+        """
+        Pacman nodes are expanded as in minimax; chance nodes return (None, expected score)
+        """
+        num_agents = game_state.getNumAgents()
+        batch_plies = num_agents if self.batchPlies == None else self.batchPlies
+        if agent_index == 0 or (self.depth - depth) * num_agents - agent_index <= batch_plies:
+            return MultiPacmanAgent.expand(self, game_state=game_state, agent_index=agent_index, depth=depth)
+
+        self.nodesExpanded += 1
+        next_agent = agent_index + 1
+        next_depth = depth
+        if next_agent == num_agents:
+            next_agent = 0
+            next_depth = depth + 1
+
+        outcomes = self.chanceOutcomes(game_state, agent_index)
+        if not outcomes:
+            return None, self.heuristicScore(game_state)
+
+        expected_score = 0
+        for move, p in outcomes:
+            prospective_state = game_state.generateSuccessor(agent_index, move)
+            _, prospective_score = self.minimax(game_state=prospective_state, agent_index=next_agent,
+                                                depth=next_depth)
+            expected_score += p * prospective_score
+        return None, expected_score
+
+
+class MoveOrdering:
+    """
+    Decides the order in which AlphaBetaPacmanAgent searches the children of a
+    node.  The better the first children are, the more of the others are pruned.
+    """
+
+    def reset(self):
+        "Called at the start of every game"
+        pass
+
+    def order(self, agent, game_state, agent_index, depth, moves):
+        """
+        Returns (move, successor state) pairs for the moves, in the order they
+        should be searched.  The successor is None when the ordering did not
+        need it; the search generates it only if it gets that far.
+        """
+        return [(move, None) for move in moves]
+
+    def recordCutoff(self, game_state, agent_index, depth, move):
+        "Called when searching move caused the remaining children to be pruned"
+        pass
+
+
+class KillerMoveOrdering(MoveOrdering):
+    """
+    Searches first the last two moves that caused a cutoff for the same agent
+    at the same depth (the "killer moves").
+    """
+
+    def reset(self):
+        self.killers = {}
+
+    def order(self, agent, game_state, agent_index, depth, moves):
+        killers = self.killers.get((agent_index, depth))
+        if killers:
+            moves = sorted(moves, key=lambda move: move not in killers)
+        return [(move, None) for move in moves]
+
+    def recordCutoff(self, game_state, agent_index, depth, move):
+        killers = self.killers.setdefault((agent_index, depth), [])
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[2:]
+
+
+class HistoryMoveOrdering(MoveOrdering):
+    """
+    Searches first the moves that caused the most cutoffs for the same agent
+    from the same position, weighting cutoffs near the root more heavily.
+    """
+
+    def reset(self):
+        self.history = util.Counter()
+
+    def order(self, agent, game_state, agent_index, depth, moves):
+        position = game_state.data.agentStates[agent_index].getPosition()
+        moves = sorted(moves, key=lambda move: -self.history[(agent_index, position, move)])
+        return [(move, None) for move in moves]
+
+    def recordCutoff(self, game_state, agent_index, depth, move):
+        position = game_state.data.agentStates[agent_index].getPosition()
+        self.history[(agent_index, position, move)] += 2 ** (-depth)
+
+
+class EvaluationMoveOrdering(MoveOrdering):
+    """
+    Searches first the children with the best heuristic score for the agent
+    to move: highest first for pacman, lowest first for the ghosts.
+    """
+
+    def order(self, agent, game_state, agent_index, depth, moves):
+        children = [(move, game_state.generateSuccessor(agent_index, move)) for move in moves]
+        scored = [(agent.heuristicScore(successor), i) for i, (_, successor) in enumerate(children)]
+        scored.sort(reverse=(agent_index == 0))
+        return [children[i] for _, i in scored]
+
+
+MOVE_ORDERINGS = {
+    'none': MoveOrdering,
+    'killer': KillerMoveOrdering,
+    'history': HistoryMoveOrdering,
+    'eval': EvaluationMoveOrdering,
+}
+
+
+class AlphaBetaPacmanAgent(MultiPacmanAgent):
+    """
+    A minimax agent with alpha-beta pruning.
+
+    It computes exactly the same values as MultiPacmanAgent, but stops searching
+    the children of a node as soon as they can no longer change the value at
+    the root.  The ordering agent argument chooses the MoveOrdering used to
+    search promising children first, e.g.
+    python pacman.py -p AlphaBetaPacmanAgent -a depth=3,ordering=killer
+    """
+
+    def __init__(self, index=0, evalFn='heuristicEvaluationFunction', depth='3', ordering='eval'):
+        MultiPacmanAgent.__init__(self, index, evalFn, depth)
+        if ordering not in MOVE_ORDERINGS:
+            raise Exception('Unknown move ordering ' + str(ordering) + '; choose from ' +
+                            ', '.join(sorted(MOVE_ORDERINGS.keys())))
+        self.moveOrdering = MOVE_ORDERINGS[ordering]()
+        self.moveOrdering.reset()
+
+    def registerInitialState(self, gameState):
+        self.moveOrdering.reset()
 
-                for move in prospective_moves:
-                    next_agent = agent_index + 1    # move to next agent
-                    next_depth = depth              # keep depth unless we are currently the last agent
+    def minimax(self, game_state, agent_index, depth, alpha=-float('inf'), beta=float('inf')):
+        """
+        Returns (best move, score) like MultiPacmanAgent.minimax when the score lies
+        within [alpha, beta]; otherwise the score is only a bound on the true value
+        (at most alpha, or at least beta).
+        """
+        leaf_score = self.leafScore(game_state, depth)
+        if leaf_score != None:
+            return None, leaf_score
+        return self.expand(game_state=game_state, agent_index=agent_index, depth=depth, alpha=alpha, beta=beta)
 
-                    if next_agent == game_state.getNumAgents():
-                        next_agent = 0          # if we are currently last ghost, set agent to pacman
-                        next_depth = depth + 1  # also increase depth, as we have calculated next move for all agents
+    def expand(self, game_state, agent_index, depth, alpha=-float('inf'), beta=float('inf')):
+        self.nodesExpanded += 1
+        next_agent = agent_index + 1
+        next_depth = depth
+        if next_agent == game_state.getNumAgents():
+            next_agent = 0
+            next_depth = depth + 1
 
-                    # generate next state and get score
+        children = self.moveOrdering.order(self, game_state, agent_index, depth,
+                                           game_state.getLegalActions(agent_index))
+
+        if agent_index == 0:
+            # Cutoffs are strict so that a child scoring exactly alpha has an exact
+            # score, which lets the root break ties the same way minimax does
+            max_score = -9999999
+            max_score_moves = list()
+            for move, prospective_state in children:
+                if prospective_state == None:
+                    prospective_state = game_state.generateSuccessor(agent_index, move)
+                _, prospective_score = self.minimax(game_state=prospective_state, agent_index=next_agent,
+                                                    depth=next_depth, alpha=alpha, beta=beta)
+                if prospective_score > max_score:
+                    max_score = prospective_score
+                    max_score_moves = [move]
+                elif prospective_score == max_score:
+                    max_score_moves.append(move)
+                if max_score > beta:
+                    self.moveOrdering.recordCutoff(game_state, agent_index, depth, move)
+                    break
+                alpha = max(alpha, max_score)
+            return random.choice(max_score_moves), max_score
+        else:
+            min_score = 9999999
+            min_score_move = None
+            for move, prospective_state in children:
+                if prospective_state == None:
                     prospective_state = game_state.generateSuccessor(agent_index, move)
-                    _, prospective_score = self.minimax(game_state=prospective_state, agent_index=next_agent,
-                                                        depth=next_depth)
-                    # if next score less than current min, set new min and move that led to it
-                    if prospective_score < min_score:
-                        min_score = prospective_score
-                        min_score_move = move
-                    prospective_scores.append(prospective_score)
-                # after finding all potential move scores & min one, return the min
-                return min_score_move, min_score
+                _, prospective_score = self.minimax(game_state=prospective_state, agent_index=next_agent,
+                                                    depth=next_depth, alpha=alpha, beta=beta)
+                if prospective_score < min_score:
+                    min_score = prospective_score
+                    min_score_move = move
+                if min_score < alpha:
+                    self.moveOrdering.recordCutoff(game_state, agent_index, depth, move)
+                    break
+                beta = min(beta, min_score)
+            return min_score_move, min_score
+
+
+class PrincipalVariationOrdering(MoveOrdering):
+    """
+    Searches first the move that the principal variation of the previous
+    iteration of an iterative deepening search took from the same state, then
+    orders the other children with another MoveOrdering.
+    """
+
+    def __init__(self, ordering):
+        self.ordering = ordering
+        self.principalVariation = {}
+
+    def reset(self):
+        self.ordering.reset()
+        self.principalVariation = {}
+
+    def order(self, agent, game_state, agent_index, depth, moves):
+        children = self.ordering.order(agent, game_state, agent_index, depth, moves)
+        pv_move = self.principalVariation.get((game_state.key(), agent_index))
+        if pv_move == None:
+            return children
+        return sorted(children, key=lambda child: child[0] != pv_move)
+
+    def recordCutoff(self, game_state, agent_index, depth, move):
+        self.ordering.recordCutoff(game_state, agent_index, depth, move)
+
+
+class SearchTimeout(Exception):
+    "Raised inside a search when its deadline has passed"
+    pass
+
+
+class IterativeDeepeningPacmanAgent(AlphaBetaPacmanAgent):
+    """
+    An anytime alpha-beta agent.
+
+    Each move it searches to depth 1, 2, 3, ... until its time budget runs out,
+    and plays the best move of the deepest search that finished.  Each search
+    tries the principal variation of the previous one first.
+
+    The budget is moveTime seconds (a tenth of a second by default), capped by
+    timeFraction of the game rules' move timeout.  The depth is set by the
+    deepening, up to maxDepth, so there is no depth argument, e.g.
+    python pacman.py -p IterativeDeepeningPacmanAgent -a moveTime=0.5,maxDepth=10
+    """
+
+    def __init__(self, index=0, evalFn='heuristicEvaluationFunction', ordering='eval', moveTime='0.1',
+                 timeFraction='0.5', maxDepth='20'):
+        AlphaBetaPacmanAgent.__init__(self, index, evalFn, '1', ordering)
+        self.moveOrdering = PrincipalVariationOrdering(self.moveOrdering)
+        self.moveTime = None if moveTime == None else float(moveTime)
+        self.timeFraction = float(timeFraction)
+        self.maxDepth = int(maxDepth)
+        self.moveTimeout = None
+        self.completedDepth = 0
+        self.bestMoves = {}
+
+    def setMoveTimeout(self, moveTimeout):
+        "Called by the game rules with the number of seconds allowed per move"
+        self.moveTimeout = moveTimeout
+
+    def getTimeBudget(self):
+        budgets = list()
+        if self.moveTime != None:
+            budgets.append(self.moveTime)
+        if self.moveTimeout != None:
+            budgets.append(self.timeFraction * self.moveTimeout)
+        if not budgets:
+            return 1.0
+        return min(budgets)
+
+    def getAction(self, gameState):
+        """
+        Returns the best action of the deepest alpha-beta search that finished in time
+        """
+        self.deadline = time.time() + self.getTimeBudget()
+        best_action = None
+        self.completedDepth = 0
+        for depth in range(1, self.maxDepth + 1):
+            self.depth = depth
+            self.bestMoves = {}
+            try:
+                action, _ = self.minimax(game_state=gameState, agent_index=self.index, depth=0)
+            except SearchTimeout:
+                break
+            best_action = action
+            self.completedDepth = depth
+            self.moveOrdering.principalVariation = self.principalVariation(gameState)
+        if best_action == None:
+            # Not even the depth 1 search finished; any legal move will do
+            best_action = random.choice(gameState.getLegalActions(self.index))
+        return best_action
+
+    def expand(self, game_state, agent_index, depth, alpha=-float('inf'), beta=float('inf')):
+        if time.time() > self.deadline:
+            raise SearchTimeout()
+        result = AlphaBetaPacmanAgent.expand(self, game_state, agent_index, depth, alpha, beta)
+        self.bestMoves[(game_state.key(), agent_index)] = result[0]
+        return result
+
+    def principalVariation(self, game_state):
+        """
+        Follows the best moves of the last finished search from game_state and returns
+        them as a dictionary from (state key, agent index) to move
+        """
+        principal_variation = {}
+        agent_index = self.index
+        for _ in range(self.depth * game_state.getNumAgents()):
+            move = self.bestMoves.get((game_state.key(), agent_index))
+            if move == None:
+                break
+            principal_variation[(game_state.key(), agent_index)] = move
+            game_state = game_state.generateSuccessor(agent_index, move)
+            if game_state.isWin() or game_state.isLose():
+                break
+            agent_index = (agent_index + 1) % game_state.getNumAgents()
+        return principal_variation
+
+
+class MCTSNode:
+    """
+    A node of the Monte Carlo search tree, reached by a sequence of pacman
+    moves.  Ghost moves are sampled anew in every iteration, so a node stands
+    for pacman's position after those moves rather than for one game state.
+    """
+
+    def __init__(self, position, actions):
+        self.position = position
+        self.untriedActions = actions[:]
+        random.shuffle(self.untriedActions)
+        self.children = {}
+        self.visits = 0
+        self.totalReward = 0.0
+
+    def selectChild(self, exploration):
+        "Returns the (action, child) pair with the highest UCB1 value"
+        log_visits = math.log(self.visits)
+
+        def ucb(item):
+            child = item[1]
+            return child.totalReward / child.visits + exploration * math.sqrt(log_visits / child.visits)
+        return max(self.children.items(), key=ucb)
+
+
+class MCTSPacmanAgent(MultiAgentSearchAgent):
+    """
+    A Monte Carlo Tree Search (UCT) agent.
+
+    Every iteration walks down the tree choosing pacman moves by UCB1 and
+    sampling the other agents' moves from their policies (the game's ghost
+    agents, as for ExpectimaxPacmanAgent), adds one node, then plays random
+    pacman moves for up to rolloutDepth rounds.  The reward is the change in
+    pacman's score.  Simulations run on a RolloutState rather than on
+    GameStates.  Each move runs `iterations` iterations, or as many as fit in
+    moveTime seconds, and the subtree of the chosen move is kept for the next
+    move, e.g.
+    python pacman.py -p MCTSPacmanAgent -a iterations=300,rolloutDepth=15
+
+    rollouts and searchTime accumulate over the game, so rollouts / searchTime
+    gives the rollouts per second.
+    """
+
+    def __init__(self, index=0, iterations='500', moveTime=None, rolloutDepth='10', exploration='100',
+                 ghost='RandomGhost'):
+        # Rollouts are scored by the change in score, so there is no evalFn or depth
+        Agent.__init__(self, index)
+        self.iterations = int(iterations)
+        self.moveTime = None if moveTime == None else float(moveTime)
+        self.rolloutDepth = int(rolloutDepth)
+        self.exploration = float(exploration)
+        self.ghostType = ghost
+        self.policies = {}
+        self.root = None
+        self.rollouts = 0
+        self.searchTime = 0.0
+
+    def setGhostAgents(self, ghostAgents):
+        "Called by the game rules with the ghost agents playing this game"
+        self.policies = dict([(ghost.index, ghost) for ghost in ghostAgents])
+
+    def registerInitialState(self, gameState):
+        self.root = None
+        self.rollouts = 0
+        self.searchTime = 0.0
+
+    def getAction(self, gameState):
+        """
+        Returns the most visited move at the root after this move's iterations
+        """
+        position = gameState.getPacmanPosition(self.index)
+        root = self.root
+        if root == None or root.position != position:
+            root = MCTSNode(position, gameState.getLegalActions(self.index))
+        start_state = RolloutState.fromGameState(gameState)
+        for agent_index in range(start_state.getNumAgents()):
+            if agent_index != self.index and agent_index not in self.policies:
+                self.policies[agent_index] = makeGhostPolicy(agent_index, start_state.getNumPacman(), self.ghostType)
+
+        start = time.time()
+        deadline = None if self.moveTime == None else start + self.moveTime
+        iterations = 0
+        while iterations < self.iterations and (deadline == None or time.time() < deadline):
+            self.runIteration(root, start_state.copy())
+            iterations += 1
+        self.rollouts += iterations
+        self.searchTime += time.time() - start
+
+        if not root.children:
+            return random.choice(gameState.getLegalActions(self.index))
+        action = max(root.children.items(), key=lambda item: item[1].visits)[0]
+        self.root = root.children[action]
+        return action
+
+    def runIteration(self, root, state):
+        start_score = state.score[self.index]
+        node = root
+        path = [root]
+        # Selection and expansion
+        while not (state.win or state.lose):
+            if node.untriedActions:
+                action = node.untriedActions.pop()
+                self.simulateRound(state, action)
+                child = MCTSNode(state.getPacmanPosition(self.index), state.getLegalActions(self.index))
+                node.children[action] = child
+                path.append(child)
+                break
+            if not node.children:
+                break
+            action, node = node.selectChild(self.exploration)
+            self.simulateRound(state, action)
+            path.append(node)
+        # Rollout
+        rounds = 0
+        while not (state.win or state.lose) and rounds < self.rolloutDepth:
+            legal = state.getLegalActions(self.index)
+            if len(legal) > 1 and Directions.STOP in legal:
+                legal.remove(Directions.STOP)
+            self.simulateRound(state, random.choice(legal))
+            rounds += 1
+        # Backpropagation
+        reward = state.score[self.index] - start_score
+        for node in path:
+            node.visits += 1
+            node.totalReward += reward
+
+    def simulateRound(self, state, action):
+        "Plays pacman's action, then one move of every other agent sampled from its policy"
+        state.applyAction(self.index, action)
+        for agent_index in range(state.getNumAgents()):
+            if agent_index == self.index:
+                continue
+            if state.win or state.lose:
+                return
+            state.applyAction(agent_index, self.policies[agent_index].getAction(state))
 
 
 class RandomAgent(MultiAgentSearchAgent):
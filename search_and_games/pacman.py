@@ -43,6 +43,8 @@ from game import GameStateData
 from game import Game
 from game import Directions
 from game import Actions
+from game import Configuration
+from game import AgentState
 from util import nearestPoint
 from util import manhattanDistance
 import util
@@ -77,20 +79,20 @@ class GameState:
     # Accessor methods: use these to access state data #
     ####################################################
 
-    # static variable keeps track of which states have had getLegalActions called
-    explored = set()
-
-    def getAndResetExplored():
-        tmp = GameState.explored.copy()
-        GameState.explored = set()
-        return tmp
-    getAndResetExplored = staticmethod(getAndResetExplored)
+    def getAndResetExplored(self):
+        """
+        Returns the set of states recorded by this game's ExplorationTracker
+        and clears it.  States are only recorded when the tracker was created
+        with recordStates=True; otherwise the set is empty.
+        """
+        if self.tracker == None:
+            return set()
+        return self.tracker.getAndReset()
 
     def getLegalActions(self, agentIndex=0):
         """
         Returns the legal actions for the agent specified.
         """
-#        GameState.explored.add(self)
         if self.isWin() or self.isLose():
             return []
 
@@ -121,18 +123,20 @@ class GameState:
         if agentIndex < state.data.numPacman:
             state.data.scoreChange[agentIndex] += -TIME_PENALTY  # Penalty for waiting around
         else:
-            GhostRules.decrementTimer(state.data.agentStates[agentIndex])
+            GhostRules.decrementTimer(state.data.writableAgentState(agentIndex))
 
         # Resolve multi-agent effects
         GhostRules.checkDeath(state, agentIndex)
 
         # Book keeping
         state.data._agentMoved = agentIndex
-        for i in range(state.data.numPacman):
-            state.data.score[i] += state.data.scoreChange[i]
+        if any(state.data.scoreChange):
+            # The score list may be shared with the predecessor, so replace it
+            state.data.score = [score + change for score, change in zip(state.data.score, state.data.scoreChange)]
         # state.data.score[agentIndex] += state.data.scoreChange[agentIndex]
-        GameState.explored.add(self)
-        GameState.explored.add(state)
+        state.data.updateKey(self.data)
+        if state.tracker != None:
+            state.tracker.recordSuccessor(self, state)
         return state
 
     def getLegalPacmanActions(self, agentIndex):
@@ -159,7 +163,7 @@ class GameState:
             raise Exception("Invalid index passed to getGhostState")
         return self.data.agentStates[agentIndex].copy()
 
-    def getPacmanPosition(self, agentIndex):
+    def getPacmanPosition(self, agentIndex=0):
         if agentIndex >= self.data.numPacman:
             raise Exception("Invalid index passed to getGhostState")
         return self.data.agentStates[agentIndex].getPosition()
@@ -168,12 +172,15 @@ class GameState:
         return [self.getPacmanPosition(s) for s in range(self.data.numPacman)]
 
     def getGhostStates(self):
-        return self.data.agentStates[self.data.numPacman:]
+        """
+        Returns copies of the ghosts' AgentStates, so they are safe to modify
+        """
+        return [s.copy() for s in self.data.agentStates[self.data.numPacman:]]
 
     def getGhostState(self, agentIndex):
         if agentIndex < self.data.numPacman or agentIndex >= self.getNumAgents():
             raise Exception("Invalid index passed to getGhostState")
-        return self.data.agentStates[agentIndex]
+        return self.data.agentStates[agentIndex].copy()
 
     def getGhostPosition(self, agentIndex):
         if agentIndex < self.data.numPacman:
@@ -181,7 +188,7 @@ class GameState:
         return self.data.agentStates[agentIndex].getPosition()
 
     def getGhostPositions(self):
-        return [s.getPosition() for s in self.getGhostStates()]
+        return [s.getPosition() for s in self.data.agentStates[self.data.numPacman:]]
 
     def getNumAgents(self):
         return len(self.data.agentStates)
@@ -199,10 +206,19 @@ class GameState:
         """
         Returns a list of positions (x,y) of the remaining capsules.
         """
-        return self.data.capsules
+        return self.data.capsules[:]
 
     def getNumFood(self):
-        return self.data.food.count()
+        return self.data.numFood
+
+    def getFoodPositions(self):
+        """
+        Returns a sorted tuple of the (x,y) positions of the remaining food,
+        in the same order as getFood().asList().  The tuple is shared with
+        the states it was generated from, so this is much cheaper than
+        scanning the food Grid.
+        """
+        return self.data.foodPositions
 
     def getFood(self):
         """
@@ -213,8 +229,11 @@ class GameState:
 
         currentFood = state.getFood()
         if currentFood[x][y] == True: ...
+
+        The Grid is a copy (which shares its bits with the state's, so it is
+        cheap), so writing to it does not change the state.
         """
-        return self.data.food
+        return self.data.food.copy()
 
     def getWalls(self):
         """
@@ -225,8 +244,11 @@ class GameState:
 
         walls = state.getWalls()
         if walls[x][y] == True: ...
+
+        The Grid is a copy, since the layout is shared by every game on it;
+        hasWall reads the layout's own walls without copying.
         """
-        return self.data.layout.walls
+        return self.data.layout.walls.copy()
 
     def hasFood(self, x, y):
         return self.data.food[x][y]
@@ -251,14 +273,41 @@ class GameState:
         """
         if prevState != None:  # Initial state
             self.data = GameStateData(prevState.data)
+            self.tracker = prevState.tracker
         else:
             self.data = GameStateData()
+            self.tracker = None
 
-    def deepCopy(self):
+    def deepCopy(self, copyLayout=False):
         state = GameState(self)
-        state.data = self.data.deepCopy()
+        state.data = self.data.deepCopy(copyLayout)
         return state
 
+    def snapshot(self):
+        """
+        Returns a compact, picklable copy of this state without its layout
+        (see GameStateData.snapshot).
+        """
+        return self.data.snapshot()
+
+    def fromSnapshot(snapshot, layout):
+        """
+        Rebuilds a GameState from GameState.snapshot() and its layout.
+        """
+        state = GameState()
+        state.data = GameStateData.fromSnapshot(snapshot, layout)
+        return state
+    fromSnapshot = staticmethod(fromSnapshot)
+
+    def key(self):
+        """
+        Returns a 64-bit Zobrist key for this state, suitable for transposition
+        tables.  It is maintained incrementally by generateSuccessor, so this
+        is O(1), and it is stable across processes.  States that compare equal
+        have the same key.
+        """
+        return self.data.key
+
     def __eq__(self, other):
         """
         Allows two states to be compared.
@@ -281,6 +330,43 @@ class GameState:
         """
         self.data.initialize(layout, numGhostAgents)
 
+
+class ExplorationTracker:
+    """
+    Instrumentation for the successors generated during one game.
+
+    A tracker is attached to a game's initial state and inherited by every
+    state generated from it, including the observations handed to agents.
+    By default it only counts calls to generateSuccessor.  With
+    recordStates=True it also keeps the distinct parent and child states it
+    sees, up to maxStates of them (None means no limit), and numExplored
+    counts them.
+    """
+
+    def __init__(self, recordStates=False, maxStates=None):
+        self.recordStates = recordStates
+        self.maxStates = maxStates
+        self.numGenerated = 0
+        self.numExplored = 0
+        self.states = set()
+
+    def recordSuccessor(self, parent, child):
+        self.numGenerated += 1
+        if self.recordStates:
+            self._record(parent)
+            self._record(child)
+
+    def _record(self, state):
+        if (self.maxStates == None or len(self.states) < self.maxStates) and state not in self.states:
+            self.states.add(state)
+            self.numExplored += 1
+
+    def getAndReset(self):
+        states = self.states
+        self.states = set()
+        self.numExplored = 0
+        return states
+
 ############################################################################
 #                     THE HIDDEN SECRETS OF PACMAN                         #
 #                                                                          #
@@ -299,15 +385,27 @@ class ClassicGameRules:
     and how the game starts and ends.
     """
 
-    def __init__(self, timeout=30):
+    def __init__(self, timeout=30, recordExplored=False, maxExplored=None, defensiveCopies=False):
         self.timeout = timeout
+        self.defensiveCopies = defensiveCopies
+        self.recordExplored = recordExplored
+        self.maxExplored = maxExplored
 
     def newGame(self, layout, pacmanAgent, ghostAgents, display, quiet=False, catchExceptions=False):
         agents = pacmanAgent + ghostAgents[:layout.getNumGhosts()]
+        # Tell time-aware agents how long they may take per move,
+        for index, agent in enumerate(agents):
+            if hasattr(agent, 'setMoveTimeout'):
+                agent.setMoveTimeout(self.getMoveTimeout(index))
+            # and let agents that model the ghosts see their policies
+            if hasattr(agent, 'setGhostAgents'):
+                agent.setGhostAgents(agents[len(pacmanAgent):])
         initState = GameState()
         initState.initialize(layout, len(ghostAgents))
-        game = Game(agents, display, self, catchExceptions=catchExceptions)
+        initState.tracker = ExplorationTracker(self.recordExplored, self.maxExplored)
+        game = Game(agents, display, self, catchExceptions=catchExceptions, defensiveCopies=self.defensiveCopies)
         game.state = initState
+        game.explorationTracker = initState.tracker
         self.initialState = initState.deepCopy()
         self.quiet = quiet
         return game
@@ -378,7 +476,7 @@ class PacmanRules:
         if action not in legal:
             raise Exception("Illegal action " + str(action))
 
-        pacmanState = state.data.agentStates[pacmanIndex]
+        pacmanState = state.data.writableAgentState(pacmanIndex)
 
         # Update Configuration
         vector = Actions.directionToVector(action, PacmanRules.PACMAN_SPEED)
@@ -397,22 +495,20 @@ class PacmanRules:
         # Eat food
         if state.data.food[x][y]:
             state.data.scoreChange[pacmanIndex] += 10
-            state.data.food = state.data.food.copy()
-            state.data.food[x][y] = False
+            state.data.removeFood(position)
             state.data._foodEaten = position
-            # TODO: cache numFood?
             numFood = state.getNumFood()
             if numFood == 0 and not state.data._lose:
                 state.data.scoreChange[pacmanIndex] += 500
                 state.data._win = True
         # Eat capsule
-        if(position in state.getCapsules()):
+        if(position in state.data.capsules):
             state.data.scoreChange[pacmanIndex] += 10 * state.getNumFood()
-            state.data.capsules.remove(position)
+            state.data.writableCapsules().remove(position)
             state.data._capsuleEaten = position
             # Reset all ghosts' scared timers
             for index in range(1, len(state.data.agentStates)):
-                state.data.agentStates[index].scaredTimer = SCARED_TIME
+                state.data.writableAgentState(index).scaredTimer = SCARED_TIME
     consume = staticmethod(consume)
 
 
@@ -427,7 +523,7 @@ class GhostRules:
         Ghosts cannot stop, and cannot turn around unless they
         reach a dead end, but can turn 90 degrees at intersections.
         """
-        conf = state.getGhostState(ghostIndex).configuration
+        conf = state.data.agentStates[ghostIndex].configuration
         possibleActions = Actions.getPossibleActions(conf, state.data.layout.walls)
         reverse = Actions.reverseDirection(conf.direction)
         if Directions.STOP in possibleActions:
@@ -443,7 +539,7 @@ class GhostRules:
         if action not in legal:
             raise Exception("Illegal ghost " + str(ghostIndex) + " action " + str(action))
 
-        ghostState = state.data.agentStates[ghostIndex]
+        ghostState = state.data.writableAgentState(ghostIndex)
         speed = GhostRules.GHOST_SPEED
         if ghostState.scaredTimer > 0:
             speed /= 2.0
@@ -454,7 +550,9 @@ class GhostRules:
     def decrementTimer(ghostState):
         timer = ghostState.scaredTimer
         if timer == 1:
-            ghostState.configuration.pos = nearestPoint(ghostState.configuration.pos)
+            # Configurations are shared between states, so build a new one
+            configuration = ghostState.configuration
+            ghostState.configuration = Configuration(nearestPoint(configuration.pos), configuration.direction)
         ghostState.scaredTimer = max(0, timer - 1)
     decrementTimer = staticmethod(decrementTimer)
 
@@ -465,14 +563,14 @@ class GhostRules:
                 ghostState = state.data.agentStates[index]
                 ghostPosition = ghostState.configuration.getPosition()
                 if GhostRules.canKill(pacmanPosition, ghostPosition):
-                    GhostRules.collide(state, ghostState, index, agentIndex)
+                    GhostRules.collide(state, state.data.writableAgentState(index), index, agentIndex)
         else:
             ghostState = state.data.agentStates[agentIndex]
             ghostPosition = ghostState.configuration.getPosition()
             for index in range(state.data.numPacman):
                 pacmanPosition = state.getPacmanPosition(index)
                 if GhostRules.canKill(pacmanPosition, ghostPosition):
-                    GhostRules.collide(state, ghostState, agentIndex, index)
+                    GhostRules.collide(state, state.data.writableAgentState(agentIndex), agentIndex, index)
     checkDeath = staticmethod(checkDeath)
 
     def collide(state, ghostState, agentIndex, pacmanIndex):
@@ -480,7 +578,8 @@ class GhostRules:
             state.data.scoreChange[pacmanIndex] += 200
             GhostRules.placeGhost(state, ghostState)
             ghostState.scaredTimer = 0
-            # Added for first-person
+            # Added for first-person; _eaten may be shared with the predecessor
+            state.data._eaten = state.data._eaten[:]
             state.data._eaten[agentIndex] = True
         else:
             if not state.data._win:
@@ -496,6 +595,181 @@ class GhostRules:
         ghostState.configuration = ghostState.start
     placeGhost = staticmethod(placeGhost)
 
+
+class RolloutState:
+    """
+    A small mutable stand-in for a GameState, for playing out many simulated
+    moves quickly (e.g. Monte Carlo rollouts).
+
+    applyAction updates the state in place under the same rules as
+    GameState.generateSuccessor, without legality checks or bookkeeping for
+    the display.  Food is kept as the bit set of a BitGrid, so copy() is cheap.
+    It supports the read accessors that the agents in ghostAgents.py use
+    (getLegalActions, getGhostState, getGhostPosition, getPacmanPositions...).
+    """
+
+    def __init__(self):
+        pass
+
+    def fromGameState(gameState):
+        data = gameState.data
+        state = RolloutState()
+        state.walls = data.layout.walls
+        state.height = data.food.height
+        state.numPacman = data.numPacman
+        state.positions = [agentState.getPosition() for agentState in data.agentStates]
+        state.directions = [agentState.getDirection() for agentState in data.agentStates]
+        state.scaredTimers = [agentState.scaredTimer for agentState in data.agentStates]
+        state.starts = [agentState.start for agentState in data.agentStates]
+        state.foodBits = data.food.bits
+        state.numFood = data.numFood
+        state.capsules = data.capsules[:]
+        state.score = data.score[:]
+        state.win = data._win
+        state.lose = data._lose
+        return state
+    fromGameState = staticmethod(fromGameState)
+
+    def copy(self):
+        state = RolloutState()
+        state.walls = self.walls
+        state.height = self.height
+        state.numPacman = self.numPacman
+        state.positions = self.positions[:]
+        state.directions = self.directions[:]
+        state.scaredTimers = self.scaredTimers[:]
+        state.starts = self.starts
+        state.foodBits = self.foodBits
+        state.numFood = self.numFood
+        state.capsules = self.capsules[:]
+        state.score = self.score[:]
+        state.win = self.win
+        state.lose = self.lose
+        return state
+
+    def getNumAgents(self):
+        return len(self.positions)
+
+    def getNumPacman(self):
+        return self.numPacman
+
+    def getPacmanPosition(self, agentIndex=0):
+        return self.positions[agentIndex]
+
+    def getPacmanPositions(self):
+        return self.positions[:self.numPacman]
+
+    def getGhostPosition(self, agentIndex):
+        return self.positions[agentIndex]
+
+    def getGhostPositions(self):
+        return self.positions[self.numPacman:]
+
+    def getGhostState(self, agentIndex):
+        agentState = AgentState(self.starts[agentIndex], False)
+        agentState.configuration = Configuration(self.positions[agentIndex], self.directions[agentIndex])
+        agentState.scaredTimer = self.scaredTimers[agentIndex]
+        return agentState
+
+    def getScore(self):
+        return self.score
+
+    def getNumFood(self):
+        return self.numFood
+
+    def getCapsules(self):
+        return self.capsules
+
+    def hasFood(self, x, y):
+        return (self.foodBits >> (x * self.height + y)) & 1 == 1
+
+    def getWalls(self):
+        return self.walls
+
+    def isWin(self):
+        return self.win
+
+    def isLose(self):
+        return self.lose
+
+    def getLegalActions(self, agentIndex=0):
+        if self.win or self.lose:
+            return []
+        x, y = self.positions[agentIndex]
+        x_int, y_int = int(x + 0.5), int(y + 0.5)
+        direction = self.directions[agentIndex]
+        # In between grid points, all agents must continue straight
+        if abs(x - x_int) + abs(y - y_int) > Actions.TOLERANCE:
+            return [direction]
+        walls = self.walls
+        possible = [dir for dir, (dx, dy) in Actions._directionsAsList if not walls[x_int + dx][y_int + dy]]
+        if agentIndex >= self.numPacman:
+            possible.remove(Directions.STOP)
+            reverse = Actions.reverseDirection(direction)
+            if reverse in possible and len(possible) > 1:
+                possible.remove(reverse)
+        return possible
+
+    def applyAction(self, agentIndex, action):
+        """
+        Moves agent agentIndex in place and resolves eating, scoring and collisions
+        """
+        if agentIndex < self.numPacman:
+            self._move(agentIndex, action, PacmanRules.PACMAN_SPEED)
+            position = self.positions[agentIndex]
+            nearest = nearestPoint(position)
+            if manhattanDistance(nearest, position) <= 0.5:
+                self._consume(nearest, agentIndex)
+            self.score[agentIndex] -= TIME_PENALTY
+            for index in range(self.numPacman, len(self.positions)):
+                if GhostRules.canKill(position, self.positions[index]):
+                    self._collide(index, agentIndex)
+        else:
+            speed = GhostRules.GHOST_SPEED
+            if self.scaredTimers[agentIndex] > 0:
+                speed /= 2.0
+            self._move(agentIndex, action, speed)
+            timer = self.scaredTimers[agentIndex]
+            if timer == 1:
+                self.positions[agentIndex] = nearestPoint(self.positions[agentIndex])
+            self.scaredTimers[agentIndex] = max(0, timer - 1)
+            for index in range(self.numPacman):
+                if GhostRules.canKill(self.positions[index], self.positions[agentIndex]):
+                    self._collide(agentIndex, index)
+
+    def _move(self, agentIndex, action, speed):
+        dx, dy = Actions.directionToVector(action, speed)
+        x, y = self.positions[agentIndex]
+        self.positions[agentIndex] = (x + dx, y + dy)
+        if action != Directions.STOP:
+            self.directions[agentIndex] = action
+
+    def _consume(self, position, pacmanIndex):
+        x, y = position
+        bit = 1 << (x * self.height + y)
+        if self.foodBits & bit:
+            self.foodBits ^= bit
+            self.numFood -= 1
+            self.score[pacmanIndex] += 10
+            if self.numFood == 0 and not self.lose:
+                self.score[pacmanIndex] += 500
+                self.win = True
+        if position in self.capsules:
+            self.score[pacmanIndex] += 10 * self.numFood
+            self.capsules.remove(position)
+            for index in range(1, len(self.positions)):
+                self.scaredTimers[index] = SCARED_TIME
+
+    def _collide(self, ghostIndex, pacmanIndex):
+        if self.scaredTimers[ghostIndex] > 0:
+            self.score[pacmanIndex] += 200
+            self.positions[ghostIndex] = self.starts[ghostIndex].getPosition()
+            self.directions[ghostIndex] = self.starts[ghostIndex].getDirection()
+            self.scaredTimers[ghostIndex] = 0
+        elif not self.win:
+            self.score[pacmanIndex] -= 500
+            self.lose = True
+
 #############################
 # FRAMEWORK TO START A GAME #
 #############################
@@ -569,6 +843,17 @@ def readCommand(argv):
                       help='Turns on exception handling and timeouts during games', default=False)
     parser.add_argument('--timeout', dest='timeout', type=int,
                       help=default('Maximum length of time an agent can spend computing in a single game'), default=30)
+    parser.add_argument('--recordExplored', action='store_true', dest='recordExplored',
+                      help='Keep the distinct states generated in each game, not just their count', default=False)
+    parser.add_argument('--maxExplored', dest='maxExplored', type=int,
+                      help=default('The maximum number of states kept per game by --recordExplored'), default=None)
+    parser.add_argument('--workers', dest='workers', type=int,
+                      help=default('Play the games over this many processes, without graphics (no training games)'), default=1)
+    parser.add_argument('--defensiveCopies', action='store_true', dest='defensiveCopies',
+                      help='Give every agent its own copy of the state and layout, for agents that cannot be trusted not to modify them',
+                      default=False)
+    parser.add_argument('--layoutCache', action='store_true', dest='layoutCache',
+                      help='Keep pre-parsed layouts in a __cache__ directory next to the layout files', default=False)
 
     options = parser.parse_args(argv)
     # if len(otherjunk) != 0:
@@ -578,8 +863,10 @@ def readCommand(argv):
     # Fix the random seed
     if options.fixRandomSeed:
         random.seed('cs188')
+        args['seed'] = 'cs188'
 
     # Choose a layout
+    layout.USE_DISK_CACHE = options.layoutCache
     args['layout'] = layout.getLayout(options.layout)
     if args['layout'] == None:
         raise Exception("The layout " + options.layout + " cannot be found")
@@ -622,6 +909,11 @@ def readCommand(argv):
     args['record'] = options.record
     args['catchExceptions'] = options.catchExceptions
     args['timeout'] = options.timeout
+    args['recordExplored'] = options.recordExplored
+    args['maxExplored'] = options.maxExplored
+    args['workers'] = options.workers
+    args['defensiveCopies'] = options.defensiveCopies
+    args['commandLine'] = argv
 
     # Special case: recorded games don't use the runGames method or args structure
     if options.gameToReplay != None:
@@ -684,11 +976,21 @@ def replayGame(layout, actions, display):
     display.finish()
 
 
-def runGames(layout, pacman, ghosts, display, numGames, record, numTraining=0, catchExceptions=False, timeout=30):
+def runGames(layout, pacman, ghosts, display, numGames, record, numTraining=0, catchExceptions=False, timeout=30,
+             recordExplored=False, maxExplored=None, workers=1, seed=None, commandLine=None,
+             defensiveCopies=False):
+    if workers > 1:
+        if commandLine == None:
+            raise Exception('Running games on several workers needs the command line to rebuild the agents from')
+        if numTraining > 0:
+            # Each worker has its own copy of the agents, so what they learn is never brought back
+            raise Exception('Training games cannot be played on several workers')
+        return runGamesInParallel(layout, numGames, record, recordExplored, workers, seed, commandLine)
+
     import __main__
     __main__.__dict__['_display'] = display
 
-    rules = ClassicGameRules(timeout)
+    rules = ClassicGameRules(timeout, recordExplored, maxExplored, defensiveCopies)
     games = []
 
     for i in range(numGames):
@@ -702,31 +1004,121 @@ def runGames(layout, pacman, ghosts, display, numGames, record, numTraining=0, c
             gameDisplay = display
             rules.quiet = False
         game = rules.newGame(layout, pacman, ghosts, gameDisplay, beQuiet, catchExceptions)
-        game.run()
+        game.run(recordHistory=record)
         if not beQuiet:
             games.append(game)
 
         if record:
-            import time
-            import pickle
-            fname = ('recorded-game-%d' % (i + 1)) +  '-'.join([str(t) for t in time.localtime()[1:6]])
-            f = open(fname, 'wb')
-            components = {'layout': layout, 'actions': game.moveHistory}
-            pickle.dump(components, f)
-            f.close()
+            recordGame(layout, game.moveHistory, i)
 
     if (numGames-numTraining) > 0:
-        scores = [game.state.getScore() for game in games]
-        wins = [game.state.isWin() for game in games]
-        winRate = wins.count(True) / float(len(wins))
-        # print('Average Score:', sum(scores) / float(len(scores)))
-        print('Scores:       ', ', '.join([str(score) for score in scores]))
-        print('Win Rate:      %d/%d (%.2f)' % (wins.count(True), len(wins), winRate))
-        print('Record:       ', ', '.join([['Loss', 'Win'][int(w)] for w in wins]))
+        printSummary([game.state.getScore() for game in games], [game.state.isWin() for game in games],
+                     [game.explorationTracker for game in games] if recordExplored else None)
 
     return games
 
 
+def recordGame(layout, moveHistory, gameIndex):
+    import time
+    import pickle
+    fname = ('recorded-game-%d' % (gameIndex + 1)) +  '-'.join([str(t) for t in time.localtime()[1:6]])
+    f = open(fname, 'wb')
+    components = {'layout': layout, 'actions': moveHistory}
+    pickle.dump(components, f)
+    f.close()
+
+
+def printSummary(scores, wins, trackers=None):
+    winRate = wins.count(True) / float(len(wins))
+    # print('Average Score:', sum(scores) / float(len(scores)))
+    print('Scores:       ', ', '.join([str(score) for score in scores]))
+    print('Win Rate:      %d/%d (%.2f)' % (wins.count(True), len(wins), winRate))
+    print('Record:       ', ', '.join([['Loss', 'Win'][int(w)] for w in wins]))
+    if trackers != None:
+        print('Successors:   ', ', '.join([str(tracker.numGenerated) for tracker in trackers]))
+        print('Explored:     ', ', '.join([str(tracker.numExplored) for tracker in trackers]))
+
+
+class GameResult:
+    """
+    The outcome of a game played in a worker process by runGamesInParallel.
+    It has the same state and explorationTracker attributes that the summary
+    reads from a Game.  The tracker's states are dropped, leaving numExplored.
+    """
+
+    def __init__(self, index, state, moveHistory, explorationTracker):
+        self.index = index
+        self.state = state
+        self.moveHistory = moveHistory
+        self.explorationTracker = explorationTracker
+
+
+_workerGameArgs = None
+
+
+def _initGameWorker(commandLine):
+    """
+    Runs once in each worker process of runGamesInParallel: rebuilds the layout,
+    agents and rules from the command line, without graphics.
+    """
+    global _workerGameArgs
+    _workerGameArgs = readCommand(commandLine + ['--quietTextGraphics', '--workers', '1'])
+
+
+def _playGame(gameIndex, seed):
+    """
+    Plays one quiet game in a worker process with the given random seed and
+    returns its GameResult.
+    """
+    random.seed(seed)
+    args = _workerGameArgs
+    rules = ClassicGameRules(args['timeout'], args['recordExplored'], args['maxExplored'], args['defensiveCopies'])
+    game = rules.newGame(args['layout'], args['pacman'], args['ghosts'], args['display'], True,
+                         args['catchExceptions'])
+    game.run(recordHistory=args['record'])
+    tracker = game.explorationTracker
+    tracker.states = set()  # only numExplored is sent back
+    # The layout is dropped from the returned state; the parent process has its own
+    final = GameState()
+    final.data.score = game.state.getScore()
+    final.data._win = game.state.isWin()
+    final.data._lose = game.state.isLose()
+    return GameResult(gameIndex, final, game.moveHistory, tracker)
+
+
+def runGamesInParallel(layout, numGames, record, recordExplored, workers, seed, commandLine):
+    """
+    Plays numGames games over a pool of worker processes.
+
+    Game i is seeded from seed and i alone, so a run is reproducible whatever the
+    number of workers or the order in which games finish.  Results are printed as
+    games finish and summarized in game order at the end.  The games are played
+    without graphics, and a list of GameResults is returned.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    if seed == None:
+        seed = random.getrandbits(32)
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_initGameWorker, initargs=(commandLine,)) as pool:
+        futures = [pool.submit(_playGame, i, '%s-%d' % (seed, i)) for i in range(numGames)]
+        for future in as_completed(futures):
+            result = future.result()
+            if record:
+                recordGame(layout, result.moveHistory, result.index)
+            score = ' '.join([str(s) for s in result.state.getScore()])
+            if result.state.isWin():
+                print('Game %d: Pacman emerges victorious! Score: %s' % (result.index + 1, score))
+            else:
+                print('Game %d: Pacman died! Score: %s' % (result.index + 1, score))
+            results.append(result)
+
+    results.sort(key=lambda result: result.index)
+    if results:
+        printSummary([result.state.getScore() for result in results], [result.state.isWin() for result in results],
+                     [result.explorationTracker for result in results] if recordExplored else None)
+    return results
+
+
 if __name__ == '__main__':
     """
     The main function called when pacman.py is run
@@ -21,6 +21,7 @@ import util
 
 class LeftTurnAgent(game.Agent):
     "An agent that turns left at every opportunity"
+    mutatesState = False
 
     def getAction(self, state):
         legal = state.getLegalPacmanActions(self.index)
@@ -40,6 +41,8 @@ class LeftTurnAgent(game.Agent):
 
 
 class GreedyAgent(Agent):
+    mutatesState = False
+
     def __init__(self, index=0, evalFn="scoreEvaluation"):
         self.evaluationFunction = lambda state: util.lookup(evalFn, globals())(state, self.index)
         assert self.evaluationFunction != None
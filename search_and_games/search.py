@@ -20,6 +20,7 @@ Pacman agents (in searchAgents.py).
 import util
 import sys
 import copy
+import time
 
 class SearchProblem:
     """
@@ -72,6 +73,22 @@ class SearchProblem:
         """
         util.raiseNotDefined()
 
+    # Problems whose actions can be undone may also define the two methods
+    # below, which bidirectionalSearch and multiGoalSearch need.
+
+    def getGoalStates(self):
+        """
+        Returns a list of all the goal states.
+        """
+        util.raiseNotDefined()
+
+    def reverseAction(self, action):
+        """
+        Returns the action that undoes action: if getResult(s, action) is t,
+        then reverseAction(action) is legal in t and its result is s.
+        """
+        util.raiseNotDefined()
+
 class Node:
     """
     Search node object for your convenience.
@@ -110,6 +127,110 @@ class Node:
     def __ne__(self, other):
         return self.state != other.state
 
+    def getActions(self):
+        """
+        Returns the actions on the path from the root to this node, found by
+        following the parent pointers.
+        """
+        actions = []
+        node = self
+        while node.parent is not None:
+            actions.append(node.action)
+            node = node.parent
+        actions.reverse()
+        return actions
+
+
+class SearchStatistics:
+    """
+    Counters kept by the search functions:
+
+      expanded     nodes whose successors were generated
+      generated    successors generated
+      maxFrontier  largest number of nodes waiting on the frontier
+      time         wall time of the search in seconds
+      found        whether a path to a goal was found
+    """
+
+    def __init__(self):
+        self.expanded = 0
+        self.generated = 0
+        self.maxFrontier = 0
+        self.time = 0.0
+        self.found = False
+
+    def __str__(self):
+        return 'expanded %d, generated %d, max frontier %d, %.3fs' % (
+            self.expanded, self.generated, self.maxFrontier, self.time)
+
+
+class Plan(list):
+    """
+    The list of actions returned by the search functions.  Its statistics
+    attribute holds the SearchStatistics of the search that found it.  If no
+    goal can be reached the plan is empty and statistics.found is False.
+    """
+
+    def __init__(self, actions=(), statistics=None):
+        list.__init__(self, actions)
+        self.statistics = statistics
+
+
+def graphSearch(problem, frontier, priority=None):
+    """
+    The graph search shared by breadthFirstSearch and aStarSearch.
+
+    Nodes are taken from frontier and goal tested when they are taken.  With
+    a util.Queue the frontier is first in first out.  When priority(node) is
+    given the frontier is a priority queue (util.IndexedPriorityQueue, or
+    any queue with update and len), and a state reached by a cheaper path
+    replaces its node on the frontier.  A state is expanded at most once, and
+    with a FIFO frontier it is only queued the first time it is reached.
+    Returns a Plan.
+    """
+    statistics = SearchStatistics()
+    start = time.perf_counter()
+    if priority == None:
+        push = frontier.push
+    else:
+        push = lambda node: frontier.update(node, priority(node))
+
+    root = Node(problem.getStartState(), None, None, 0)
+    push(root)
+    frontierSize = 1
+    statistics.maxFrontier = 1
+    reached = {root.state: 0}
+    closed = set()
+    plan = Plan([], statistics)
+    while not frontier.isEmpty():
+        node = frontier.pop()
+        frontierSize -= 1
+        if node.state in closed:
+            continue
+        if problem.goalTest(node.state):
+            plan = Plan(node.getActions(), statistics)
+            statistics.found = True
+            break
+        closed.add(node.state)
+        statistics.expanded += 1
+        for action in problem.getActions(node.state):
+            child = problem.getResult(node.state, action)
+            statistics.generated += 1
+            if child in closed:
+                continue
+            cost = node.path_cost + problem.getCost(node.state, action)
+            if child in reached and (priority == None or reached[child] <= cost):
+                continue
+            reached[child] = cost
+            push(Node(child, node, action, cost))
+            frontierSize += 1
+        if priority != None:
+            frontierSize = len(frontier)  # updated nodes replace the ones already queued
+        if frontierSize > statistics.maxFrontier:
+            statistics.maxFrontier = frontierSize
+    statistics.time = time.perf_counter() - start
+    return plan
+
 
 def tinyMazeSearch(problem):
     """
@@ -125,10 +246,9 @@ def breadthFirstSearch(problem):
     """
     Search the shallowest nodes in the search tree first.
 
-    You are not required to implement this, but you may find it useful for Q5.
+    Returns a Plan with the fewest actions, ignoring action costs.
     """
-    "*** YOUR CODE HERE ***"
-    util.raiseNotDefined()
+    return graphSearch(problem, util.Queue())
 
 def nullHeuristic(state, problem=None):
     """
@@ -157,17 +277,386 @@ def iterativeDeepeningSearch(problem: SearchProblem):
     or the resulting cost for one of these actions
     by calling problem.getCost(problem.getStartState(), one_of_the_actions)
 
+    Each depth-limited search remembers the shallowest depth at which it has
+    reached every state, and only searches a state again from a shallower
+    depth, so the Plan returned has the fewest actions.  The search stops
+    when a limit cuts nothing off without reaching a goal.
     """
-    "*** YOUR CODE HERE ***"
-    util.raiseNotDefined()
-    
+    statistics = SearchStatistics()
+    start = time.perf_counter()
+    plan = Plan([], statistics)
+    root = Node(problem.getStartState(), None, None, 0)
+    limit = 0
+    cutOff = True
+    while cutOff:
+        cutOff = False
+        shallowest = {root.state: 0}
+        stack = [(root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            if problem.goalTest(node.state):
+                plan = Plan(node.getActions(), statistics)
+                statistics.found = True
+                break
+            if depth == limit:
+                cutOff = True
+                continue
+            statistics.expanded += 1
+            for action in reversed(problem.getActions(node.state)):
+                child = problem.getResult(node.state, action)
+                statistics.generated += 1
+                if shallowest.get(child, depth + 2) <= depth + 1:
+                    continue
+                shallowest[child] = depth + 1
+                stack.append((Node(child, node, action, node.path_cost + problem.getCost(node.state, action)),
+                              depth + 1))
+            if len(stack) > statistics.maxFrontier:
+                statistics.maxFrontier = len(stack)
+        if statistics.found:
+            break
+        limit += 1
+    statistics.time = time.perf_counter() - start
+    return plan
+
 
 def aStarSearch(problem, heuristic=nullHeuristic):
-    """Search the node that has the lowest combined cost and heuristic first."""
-    "*** YOUR CODE HERE ***"
-    util.raiseNotDefined()
+    """
+    Search the node that has the lowest combined cost and heuristic first.
+
+    Returns a Plan of least cost when the heuristic is consistent.
+    """
+    return graphSearch(problem, util.IndexedPriorityQueue(),
+                       lambda node: node.path_cost + heuristic(node.state, problem))
+
+def iterativeDeepeningAStarSearch(problem, heuristic=nullHeuristic):
+    """
+    Depth first searches that cut off every node whose cost plus heuristic
+    exceeds a bound, starting from the heuristic of the start state and
+    raising the bound each time to the least value that was cut off (IDA*).
+
+    Only the states on the current path are remembered, and they are not
+    revisited, so memory grows with the length of the solution rather than
+    with the number of states reached.  This suits problems like the sliding
+    puzzles, whose states are many and cheap to generate again.  Returns a
+    Plan of least cost when the heuristic is admissible; maxFrontier in its
+    statistics is the longest path searched.
+    """
+    statistics = SearchStatistics()
+    startTime = time.perf_counter()
+    root = problem.getStartState()
+    actions = []
+    onPath = set([root])
+
+    def boundedSearch(state, cost, bound):
+        # Returns None once a goal is reached, else the least cost plus
+        # heuristic over the bound among the nodes cut off
+        f = cost + heuristic(state, problem)
+        if f > bound:
+            return f
+        if problem.goalTest(state):
+            return None
+        statistics.expanded += 1
+        if len(actions) >= statistics.maxFrontier:
+            statistics.maxFrontier = len(actions) + 1
+        least = float('inf')
+        for action in problem.getActions(state):
+            child = problem.getResult(state, action)
+            statistics.generated += 1
+            if child in onPath:
+                continue
+            onPath.add(child)
+            actions.append(action)
+            cutOff = boundedSearch(child, cost + problem.getCost(state, action), bound)
+            if cutOff == None:
+                return None
+            actions.pop()
+            onPath.remove(child)
+            least = min(least, cutOff)
+        return least
+
+    bound = heuristic(root, problem)
+    while True:
+        cutOff = boundedSearch(root, 0, bound)
+        if cutOff == None:
+            statistics.found = True
+            break
+        if cutOff == float('inf'):
+            actions = []
+            break
+        bound = cutOff
+    statistics.time = time.perf_counter() - startTime
+    return Plan(actions, statistics)
+
+def bidirectionalSearch(problem, heuristic=nullHeuristic, reverseHeuristic=nullHeuristic):
+    """
+    Searches forward from the start and backward from every goal state at
+    once, for problems that define getGoalStates and reverseAction.
+
+    heuristic(state, problem) estimates the cost from state to a goal and
+    reverseHeuristic(state, problem) the cost from the start to state; both
+    must be consistent.  Each side runs A* on the average of the two, and the
+    search stops when the cheapest keys left on the two frontiers add up to
+    no less than the cheapest path found through a state reached from both
+    sides, so the Plan returned is of least cost.  With the null heuristics
+    this is bidirectional uniform cost search, which is breadth first search
+    from both ends when every action costs 1.  The problem counts expanded
+    nodes in problem._expanded as usual.
+    """
+    statistics = SearchStatistics()
+    startTime = time.perf_counter()
+    potential = lambda state: (heuristic(state, problem) - reverseHeuristic(state, problem)) / 2.0
+
+    start = problem.getStartState()
+    # For each side: the cost of the cheapest path found to (or from) each state,
+    # the parent pointers, the frontier and the expanded states.  Backward parent
+    # pointers hold (next state, action from the state to the next state).
+    costs = [{start: 0}, {}]
+    parents = [{start: None}, {}]
+    frontiers = [util.IndexedPriorityQueue(), util.IndexedPriorityQueue()]
+    closed = [set(), set()]
+    frontiers[0].push(start, potential(start))
+    for goal in problem.getGoalStates():
+        costs[1][goal] = 0
+        parents[1][goal] = None
+        frontiers[1].push(goal, -potential(goal))
+    best = float('inf')
+    meeting = start if start in costs[1] else None
+    if meeting != None:
+        best = 0
+
+    while not frontiers[0].isEmpty() and not frontiers[1].isEmpty():
+        if frontiers[0].peekPriority() + frontiers[1].peekPriority() >= best:
+            break
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        state = frontiers[side].pop()
+        closed[side].add(state)
+        statistics.expanded += 1
+        cost = costs[side][state]
+        other = 1 - side
+        for action in problem.getActions(state):
+            neighbor = problem.getResult(state, action)
+            statistics.generated += 1
+            if neighbor in closed[side]:
+                continue
+            if side == 0:
+                neighborCost = cost + problem.getCost(state, action)
+                key = neighborCost + potential(neighbor)
+                link = (state, action)
+            else:
+                backAction = problem.reverseAction(action)
+                neighborCost = cost + problem.getCost(neighbor, backAction)
+                key = neighborCost - potential(neighbor)
+                link = (state, backAction)
+            if neighbor in costs[side] and costs[side][neighbor] <= neighborCost:
+                continue
+            costs[side][neighbor] = neighborCost
+            parents[side][neighbor] = link
+            frontiers[side].update(neighbor, key)
+            if neighbor in costs[other] and neighborCost + costs[other][neighbor] < best:
+                best = neighborCost + costs[other][neighbor]
+                meeting = neighbor
+        statistics.maxFrontier = max(statistics.maxFrontier, len(frontiers[0]) + len(frontiers[1]))
+
+    plan = Plan([], statistics)
+    if meeting != None:
+        actions = []
+        state = meeting
+        while parents[0][state] != None:
+            state, action = parents[0][state]
+            actions.append(action)
+        actions.reverse()
+        state = meeting
+        while parents[1][state] != None:
+            state, action = parents[1][state]
+            actions.append(action)
+        plan = Plan(actions, statistics)
+        statistics.found = True
+    statistics.time = time.perf_counter() - startTime
+    return plan
+
+
+def multiGoalSearch(problem, goals=None):
+    """
+    Finds least cost paths from the start to every state in goals (by
+    default problem.getGoalStates()) in one uniform cost sweep, which stops
+    once every goal has been reached.  Returns a dict from each reachable
+    goal to its Plan; the Plans share one SearchStatistics.
+    """
+    statistics = SearchStatistics()
+    startTime = time.perf_counter()
+    if goals == None:
+        goals = problem.getGoalStates()
+    remaining = set(goals)
+    plans = {}
+    root = Node(problem.getStartState(), None, None, 0)
+    frontier = util.IndexedPriorityQueue()
+    frontier.push(root, 0)
+    reached = {root.state: 0}
+    closed = set()
+    while remaining and not frontier.isEmpty():
+        node = frontier.pop()
+        closed.add(node.state)
+        if node.state in remaining:
+            remaining.discard(node.state)
+            plans[node.state] = Plan(node.getActions(), statistics)
+            if not remaining:
+                break
+        statistics.expanded += 1
+        for action in problem.getActions(node.state):
+            child = problem.getResult(node.state, action)
+            statistics.generated += 1
+            if child in closed:
+                continue
+            cost = node.path_cost + problem.getCost(node.state, action)
+            if child in reached and reached[child] <= cost:
+                continue
+            reached[child] = cost
+            frontier.update(Node(child, node, action, cost), cost)
+        statistics.maxFrontier = max(statistics.maxFrontier, len(frontier))
+    statistics.found = not remaining
+    statistics.time = time.perf_counter() - startTime
+    return plans
+
+
+def jumpPointPath(walls, start, goal, heuristic=None):
+    """
+    Finds a shortest path between two positions of a 4-connected grid in
+    which every move costs 1, by A* over jump points.
+
+    Of the many equally short paths in open areas, only canonical ones are
+    searched: those that make their horizontal moves before their vertical
+    ones unless a wall forces the turn.  So a horizontal run looks up and
+    down from each cell it crosses and only stops where one of those
+    vertical runs stops, a vertical run only stops beside a wall that ends,
+    and the cells crossed are never put on the frontier.  heuristic(position)
+    must be consistent; it defaults to the Manhattan distance to goal.
+    Returns a Plan whose expanded counter counts jump points.
+    """
+    from game import Directions, Actions
+    statistics = SearchStatistics()
+    startTime = time.perf_counter()
+    width, height = walls.width, walls.height
+    goalX, goalY = goal
+    if heuristic == None:
+        heuristic = lambda position: abs(position[0] - goalX) + abs(position[1] - goalY)
+
+    def isOpen(x, y):
+        return 0 <= x < width and 0 <= y < height and not walls[x][y]
+
+    def jumpVertical(x, y, dy):
+        while True:
+            y += dy
+            if not isOpen(x, y):
+                return None
+            if x == goalX and y == goalY:
+                return x, y
+            if (isOpen(x - 1, y) and not isOpen(x - 1, y - dy)) or (isOpen(x + 1, y) and not isOpen(x + 1, y - dy)):
+                return x, y
+
+    def jumpHorizontal(x, y, dx):
+        while True:
+            x += dx
+            if not isOpen(x, y):
+                return None
+            if (x == goalX and y == goalY) or jumpVertical(x, y, 1) or jumpVertical(x, y, -1):
+                return x, y
+
+    def directions(position, arrival):
+        x, y = position
+        if arrival == None:
+            return [(1, 0), (-1, 0), (0, 1), (0, -1)]
+        dx, dy = arrival
+        if dy == 0:
+            return [(dx, 0), (0, 1), (0, -1)]
+        return [(0, dy)] + [(s, 0) for s in (1, -1) if isOpen(x + s, y) and not isOpen(x + s, y - dy)]
+
+    # Jump points are queued with the direction they were reached in
+    frontier = util.IndexedPriorityQueue()
+    frontier.push(start, heuristic(start))
+    costs = {start: 0}
+    parents = {start: None}
+    arrivals = {start: None}
+    closed = set()
+    found = False
+    while not found and not frontier.isEmpty():
+        position = frontier.pop()
+        if position == goal:
+            found = True
+            break
+        closed.add(position)
+        statistics.expanded += 1
+        x, y = position
+        for dx, dy in directions(position, arrivals[position]):
+            if dy == 0:
+                jumpPoint = jumpHorizontal(x, y, dx)
+            else:
+                jumpPoint = jumpVertical(x, y, dy)
+            if jumpPoint == None:
+                continue
+            statistics.generated += 1
+            if jumpPoint in closed:
+                continue
+            cost = costs[position] + abs(jumpPoint[0] - x) + abs(jumpPoint[1] - y)
+            if jumpPoint in costs and costs[jumpPoint] <= cost:
+                continue
+            costs[jumpPoint] = cost
+            parents[jumpPoint] = position
+            arrivals[jumpPoint] = (dx, dy)
+            frontier.update(jumpPoint, cost + heuristic(jumpPoint))
+        statistics.maxFrontier = max(statistics.maxFrontier, len(frontier))
+
+    plan = Plan([], statistics)
+    if found:
+        actions = []
+        position = goal
+        while parents[position] != None:
+            parent = parents[position]
+            dx, dy = position[0] - parent[0], position[1] - parent[1]
+            steps = abs(dx) + abs(dy)
+            actions.extend([Actions.vectorToDirection((dx // steps, dy // steps))] * steps)
+            position = parent
+        actions.reverse()
+        plan = Plan(actions, statistics)
+        statistics.found = True
+    statistics.time = time.perf_counter() - startTime
+    return plan
+
+
+def jumpPointSearch(problem, heuristic=nullHeuristic):
+    """
+    Jump point search (see jumpPointPath) for a PositionSearchProblem with
+    unit costs, or any problem with walls, a position start state and a
+    single goal position.  heuristic(state, problem) must be consistent; the
+    Manhattan distance is used when it is the null heuristic.  Jump points
+    expanded are added to problem._expanded.
+    """
+    if heuristic == nullHeuristic:
+        plan = jumpPointPath(problem.walls, problem.getStartState(), problem.goal)
+    else:
+        plan = jumpPointPath(problem.walls, problem.getStartState(), problem.goal,
+                             lambda position: heuristic(position, problem))
+    if '_expanded' in dir(problem):
+        problem._expanded += plan.statistics.expanded
+    return plan
+
+
+def jumpPointDistance(walls, start, goal):
+    """
+    Returns the length of the shortest path from start to goal found by
+    jumpPointPath, or None if there is none.  Problems whose states have a
+    position component can use it to measure a leg between two positions,
+    as searchAgents.legDistance does for the food search problems.
+    """
+    plan = jumpPointPath(walls, start, goal)
+    if not plan.statistics.found:
+        return None
+    return len(plan)
+
 
 # Abbreviations
 bfs = breadthFirstSearch
 astar = aStarSearch
+idastar = iterativeDeepeningAStarSearch
 ids = iterativeDeepeningSearch
+bidir = bidirectionalSearch
+jps = jumpPointSearch
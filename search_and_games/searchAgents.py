@@ -37,13 +37,16 @@ Good luck and happy searching!
 from game import Directions
 from game import Agent
 from game import Actions
+from game import BitGrid
 import util
 import time
+from collections import OrderedDict
 import search
 import warnings
 
 class GoWestAgent(Agent):
     "An agent that goes West until it can't."
+    mutatesState = False
 
     def getAction(self, state):
         "The agent receives a GameState (defined in pacman.py)."
@@ -75,7 +78,8 @@ class SearchAgent(Agent):
     Note: You should NOT change any code in SearchAgent
     """
 
-    def __init__(self, fn='aStarSearch', prob='PositionSearchProblem', heuristic='nullHeuristic'):
+    def __init__(self, index=0, fn='aStarSearch', prob='PositionSearchProblem', heuristic='nullHeuristic'):
+        self.index = index
         # Warning: some advanced Python magic is employed below to find the right functions and problems
 
         # Get the search function from the name and heuristic
@@ -218,6 +222,12 @@ class PositionSearchProblem(search.SearchProblem):
             warnings.warn("Warning: checking the result of an invalid state, action pair.")
             return state
 
+    def getGoalStates(self):
+        return [self.goal]
+
+    def reverseAction(self, action):
+        return Actions.reverseDirection(action)
+
     def getCost(self, state, action):
         """
         Given a state and an action, returns associated cost, which is
@@ -252,6 +262,12 @@ def manhattanHeuristic(position, problem, info={}):
     xy2 = problem.goal
     return abs(xy1[0] - xy2[0]) + abs(xy1[1] - xy2[1])
 
+def startManhattanHeuristic(position, problem, info={}):
+    "The Manhattan distance from the start, a reverseHeuristic for search.bidirectionalSearch"
+    xy1 = position
+    xy2 = problem.getStartState()
+    return abs(xy1[0] - xy2[0]) + abs(xy1[1] - xy2[1])
+
 def euclideanHeuristic(position, problem, info={}):
     "The Euclidean distance heuristic for a PositionSearchProblem"
     xy1 = position
@@ -373,7 +389,8 @@ def cornersHeuristic(state, problem):
 
 class AStarCornersAgent(SearchAgent):
     "A SearchAgent for FoodSearchProblem using A* and your foodHeuristic"
-    def __init__(self):
+    def __init__(self, index=0):
+        self.index = index
         self.searchFunction = lambda prob: search.aStarSearch(prob, cornersHeuristic)
         self.searchType = CornersProblem
 
@@ -384,7 +401,7 @@ class FoodSearchProblem:
 
     A search state in this problem is a tuple ( pacmanPosition, foodGrid ) where
       pacmanPosition: a tuple (x,y) of integers specifying Pacman's position
-      foodGrid:       a Grid (see game.py) of either True or False, specifying remaining food
+      foodGrid:       a Grid or BitGrid (see game.py) of either True or False, specifying remaining food
     """
     def __init__(self, startingGameState):
         self.start = (startingGameState.getPacmanPosition(), startingGameState.getFood())
@@ -399,6 +416,18 @@ class FoodSearchProblem:
     def goalTest(self, state):
         return state[1].count() == 0
 
+    def getFoodGrid(self, state):
+        "Returns the food left in state as a grid."
+        return state[1]
+
+    def getFoodList(self, state):
+        "Returns the positions of the food left in state."
+        return state[1].asList()
+
+    def getFoodCount(self, state):
+        "Returns the amount of food left in state."
+        return state[1].count()
+
     def getActions(self, state):
         """
         Given a state, returns available actions.
@@ -456,15 +485,140 @@ class FoodSearchProblem:
             cost += 1
         return cost
 
+class FoodSearchState:
+    """
+    A compact CompactFoodSearchProblem state: Pacman's position and an integer
+    whose bit i is set while the problem's i-th initial food cell still has
+    food.  The hash is computed once, when the state is made.
+    """
+    __slots__ = ('position', 'food', '_hash')
+
+    def __init__(self, position, food):
+        self.position = position
+        self.food = food
+        self._hash = hash((position, food))
+
+    def __eq__(self, other):
+        return isinstance(other, FoodSearchState) and self.food == other.food and self.position == other.position
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return self._hash
+
+    def __getitem__(self, i):
+        return (self.position, self.food)[i]
+
+    def __iter__(self):
+        return iter((self.position, self.food))
+
+    def __repr__(self):
+        return 'FoodSearchState(%s, %s)' % (self.position, bin(self.food))
+
+class CompactFoodSearchProblem(FoodSearchProblem):
+    """
+    The FoodSearchProblem with FoodSearchState states instead of (position,
+    foodGrid) tuples.  Eating a food clears one bit of a small integer rather
+    than copying a grid, and the moves out of every cell are found once, up
+    front.
+
+    Heuristics written for FoodSearchProblem states can be used through
+    gridHeuristic, or can ask the problem for getFoodGrid, getFoodList and
+    getFoodCount, which work with either encoding.
+    """
+    def __init__(self, startingGameState):
+        FoodSearchProblem.__init__(self, startingGameState)
+        position, foodGrid = self.start
+        self.width, self.height = foodGrid.width, foodGrid.height
+        self.foodCells = foodGrid.asList()
+        self.foodBits = dict([(cell, 1 << i) for i, cell in enumerate(self.foodCells)])
+        self.start = FoodSearchState(position, (1 << len(self.foodCells)) - 1)
+        # moves[cell] maps each legal action out of cell to the cell it leads to
+        self.moves = {}
+        for x, y in self.walls.asList(False):
+            moves = self.moves[(x, y)] = {}
+            for direction in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
+                dx, dy = Actions.directionToVector(direction)
+                nextx, nexty = int(x + dx), int(y + dy)
+                if not self.walls[nextx][nexty]:
+                    moves[direction] = (nextx, nexty)
+
+    def goalTest(self, state):
+        return state.food == 0
+
+    def getActions(self, state):
+        self._expanded += 1 # DO NOT CHANGE
+        return list(self.moves[state.position])
+
+    def getResult(self, state, action):
+        nextPosition = self.moves[state.position].get(action)
+        if nextPosition == None:
+            warnings.warn("Warning: checking the result of an invalid state, action pair.")
+            return state
+        bit = self.foodBits.get(nextPosition, 0)
+        return FoodSearchState(nextPosition, state.food & ~bit)
+
+    def getCost(self, state, action):
+        if action in self.moves[state.position]:
+            return 1
+        return 0
+
+    def getFoodGrid(self, state):
+        bits = 0
+        for x, y in self.getFoodList(state):
+            bits |= 1 << (x * self.height + y)
+        return BitGrid(self.width, self.height, bits=bits)
+
+    def getFoodList(self, state):
+        return [cell for i, cell in enumerate(self.foodCells) if state.food >> i & 1]
+
+    def getFoodCount(self, state):
+        return bin(state.food).count('1')
+
+    def toGridState(self, state):
+        """
+        Returns state in the FoodSearchProblem encoding: (position, foodGrid).
+        """
+        return (state.position, self.getFoodGrid(state))
+
+    def fromGridState(self, state):
+        """
+        Returns the FoodSearchState for a (position, foodGrid) state.
+        """
+        position, foodGrid = state
+        food = 0
+        for cell in foodGrid.asList():
+            food |= self.foodBits[cell]
+        return FoodSearchState(position, food)
+
+def gridHeuristic(heuristic):
+    """
+    Adapts a heuristic for (position, foodGrid) states to the states of
+    either food search problem, e.g.
+    search.aStarSearch(CompactFoodSearchProblem(gameState), gridHeuristic(foodHeuristic))
+    """
+    def adapted(state, problem):
+        if isinstance(state, FoodSearchState):
+            state = problem.toGridState(state)
+        return heuristic(state, problem)
+    return adapted
+
 class AStarFoodSearchAgent(SearchAgent):
     "A SearchAgent for FoodSearchProblem using A* and your foodHeuristic"
-    def __init__(self):
+    def __init__(self, index=0):
+        self.index = index
         self.searchFunction = lambda prob: search.aStarSearch(prob, foodHeuristic)
         self.searchType = FoodSearchProblem
 
 def foodHeuristic(state, problem):
     """
-    Your heuristic for the FoodSearchProblem goes here.
+    The heuristic for the FoodSearchProblem: the largest of foodMSTHeuristic,
+    farthestFoodHeuristic and foodPairHeuristic.
+
+    A* with it solves trickySearch after a couple of hundred expansions, but
+    no admissible heuristic makes an optimal search of mediumSearch or
+    bigSearch quick.
 
     This heuristic must be consistent to ensure correctness.  First, try to come
     up with an admissible heuristic; almost all admissible heuristics will be
@@ -476,28 +630,238 @@ def foodHeuristic(state, problem):
     solutions, so be careful.
 
     The state is a tuple ( pacmanPosition, foodGrid ) where foodGrid is a Grid
-    (see game.py) of either True or False. You can call foodGrid.asList() to get
-    a list of food coordinates instead.
+    (see game.py) of either True or False, or a FoodSearchState; state[1] is
+    the food left in either case.
 
-    If you want access to info like walls, capsules, etc., you can query the
-    problem.  For example, problem.walls gives you a Grid of where the walls
-    are.
+    Information reused across calls is kept in problem.heuristicInfo['food'],
+    a FoodHeuristicInfo.
+    """
+    return foodHeuristicInfo(problem).evaluate(state, FoodHeuristicInfo.largest)
 
-    If you want to *store* information to be reused in other calls to the
-    heuristic, there is a dictionary called problem.heuristicInfo that you can
-    use. For example, if you only want to count the walls once and store that
-    value, try: problem.heuristicInfo['wallCount'] = problem.walls.count()
-    Subsequent calls to this heuristic can access
-    problem.heuristicInfo['wallCount']
+def foodMSTHeuristic(state, problem):
     """
-    position, foodGrid = state
-    "*** YOUR CODE HERE ***"
-    return 0
+    The weight of a minimum spanning tree of the food left, by maze distance,
+    plus the maze distance to the nearest food.  Pacman's path from the first
+    food it eats on spans all the food, so it is at least as long as the tree.
+    """
+    return foodHeuristicInfo(problem).evaluate(state, FoodHeuristicInfo.mst)
+
+def farthestFoodHeuristic(state, problem):
+    "The maze distance to the farthest food left."
+    return foodHeuristicInfo(problem).evaluate(state, FoodHeuristicInfo.farthest)
+
+def legDistance(problem, start, goal):
+    """
+    The maze distance between two positions of problem, found by jump point
+    search (search.jumpPointDistance) on problem.walls, or None if there is
+    no path.  Legs are remembered in problem.heuristicInfo['legs'], so each
+    pair of positions is only searched once.
+    """
+    legs = problem.heuristicInfo.get('legs')
+    if legs == None:
+        legs = problem.heuristicInfo['legs'] = {}
+    key = (start, goal) if start <= goal else (goal, start)
+    if key not in legs:
+        legs[key] = search.jumpPointDistance(problem.walls, start, goal)
+    return legs[key]
+
+def farthestFoodLegHeuristic(state, problem):
+    """
+    The maze distance to the farthest food left, with the legs measured by
+    legDistance instead of a DistanceTable.  It works with either food
+    search problem, without building the layout's all-pairs table.
+    """
+    position = state[0]
+    distances = [legDistance(problem, position, food) for food in problem.getFoodList(state)]
+    return max([d for d in distances if d != None] + [0])
+
+def foodPairHeuristic(state, problem):
+    """
+    The largest, over the longest pairs of food a and b, of the maze distance
+    between a and b plus the distance from Pacman to the nearer of the two.
+    Pacman has to reach one of them and then walk to the other.  Only the
+    FoodHeuristicInfo.numPairs longest pairs are tried, and they are found
+    once per food set, so a call takes constant time.
+    """
+    return foodHeuristicInfo(problem).evaluate(state, FoodHeuristicInfo.pairwise)
+
+def foodHeuristicInfo(problem):
+    "Returns the FoodHeuristicInfo of a food search problem, making it on first use."
+    info = problem.heuristicInfo.get('food')
+    if info == None:
+        info = problem.heuristicInfo['food'] = FoodHeuristicInfo(problem)
+    return info
+
+class FoodSet:
+    """
+    A set of food cells, as DistanceTable cell ids, and what the food
+    heuristics have worked out about it so far.  None means not yet known.
+    """
+    __slots__ = ('ids', 'mstWeight', 'longestPairs')
+
+    def __init__(self, ids):
+        self.ids = ids
+        self.mstWeight = None
+        self.longestPairs = None
+
+class FoodHeuristicInfo:
+    """
+    The state the food heuristics share for one food search problem: the
+    layout's DistanceTable, and a bounded cache of FoodSets keyed by the food
+    left, state[1], which is the food grid of a FoodSearchProblem state and
+    the bitmask of a FoodSearchState.  The cache forgets the least recently
+    used FoodSet when it holds maxSize of them.
+
+    calls and time count the heuristic evaluations and the seconds they took;
+    hits, misses and evictions count cache lookups as in the transposition
+    tables of multiAgents.py.
+
+    The pairs of the food the problem starts with are sorted by maze distance
+    once, on first use, and a FoodSet's numPairs longest pairs are the first
+    of them whose food are both left.
+    """
+    numPairs = 8
+
+    def __init__(self, problem, maxSize=50000):
+        self.table = problem.startingGameState.data.layout.getDistanceTable()
+        self.getFoodList = problem.getFoodList
+        self.startIds = [self.table.cellIds[cell] for cell in problem.getFoodList(problem.getStartState())]
+        self.pairs = None
+        self.neighbors = [[neighbor for _, neighbor in moves] for moves in self.table.moves]
+        self.maxSize = maxSize
+        self.foodSets = OrderedDict()
+        self.calls = 0
+        self.time = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def evaluate(self, state, bound):
+        """
+        Returns bound(self, distances, foodSet), where distances are the maze
+        distances from Pacman's position indexed by cell id and foodSet is
+        the FoodSet of the food left in state.
+        """
+        start = time.perf_counter()
+        position, food = state
+        foodSet = self.foodSets.get(food)
+        if foodSet == None:
+            self.misses += 1
+            foodSet = FoodSet([self.table.cellIds[cell] for cell in self.getFoodList(state)])
+            if len(self.foodSets) >= self.maxSize:
+                self.foodSets.popitem(last=False)
+                self.evictions += 1
+            self.foodSets[food] = foodSet
+        else:
+            self.hits += 1
+            self.foodSets.move_to_end(food)
+        numCells = self.table.numCells
+        row = self.table.cellIds[position] * numCells
+        value = bound(self, self.table.distances[row:row + numCells], foodSet)
+        self.calls += 1
+        self.time += time.perf_counter() - start
+        return value
+
+    def farthest(self, distances, foodSet):
+        if not foodSet.ids:
+            return 0
+        return max([distances[i] for i in foodSet.ids])
+
+    def mst(self, distances, foodSet):
+        if not foodSet.ids:
+            return 0
+        if foodSet.mstWeight == None:
+            foodSet.mstWeight = self.spanningTreeWeight(foodSet.ids)
+        return foodSet.mstWeight + min([distances[i] for i in foodSet.ids])
+
+    def pairwise(self, distances, foodSet):
+        if len(foodSet.ids) < 2:
+            return self.farthest(distances, foodSet)
+        if foodSet.longestPairs == None:
+            foodSet.longestPairs = self.longestPairs(foodSet.ids)
+        return max([d + min(distances[a], distances[b]) for d, a, b in foodSet.longestPairs])
+
+    def largest(self, distances, foodSet):
+        return max(self.mst(distances, foodSet), self.farthest(distances, foodSet), self.pairwise(distances, foodSet))
+
+    def spanningTreeWeight(self, ids):
+        """
+        Returns the weight of a minimum spanning tree of the cells by maze
+        distance.  A breadth first search from all of the cells at once finds
+        the cell nearest each open cell; every maze edge between the regions
+        of two cells a and b gives a path from a to b, and a minimum spanning
+        tree of those paths is one of the cells (Mehlhorn 1988).  This takes
+        time linear in the size of the maze rather than quadratic in the
+        number of cells.
+        """
+        neighbors = self.neighbors
+        nearest = [-1] * self.table.numCells
+        depth = [0] * self.table.numCells
+        for i in ids:
+            nearest[i] = i
+        frontier = list(ids)
+        while frontier:
+            nextFrontier = []
+            for cell in frontier:
+                for neighbor in neighbors[cell]:
+                    if nearest[neighbor] == -1:
+                        nearest[neighbor] = nearest[cell]
+                        depth[neighbor] = depth[cell] + 1
+                        nextFrontier.append(neighbor)
+            frontier = nextFrontier
+        edges = []
+        for cell, source in enumerate(nearest):
+            if source != -1:
+                for neighbor in neighbors[cell]:
+                    if neighbor > cell and nearest[neighbor] != source:
+                        edges.append((depth[cell] + depth[neighbor] + 1, source, nearest[neighbor]))
+        edges.sort()
+
+        # Kruskal's algorithm on the edges between regions
+        parent = dict([(i, i) for i in ids])
+        weight = 0
+        joined = 1
+        for d, a, b in edges:
+            while parent[a] != a:
+                parent[a] = a = parent[parent[a]]
+            while parent[b] != b:
+                parent[b] = b = parent[parent[b]]
+            if a != b:
+                parent[a] = b
+                weight += d
+                joined += 1
+                if joined == len(ids):
+                    break
+        return weight
+
+    def longestPairs(self, ids):
+        "Returns the numPairs longest (distance, a, b) pairs of the food cells by maze distance."
+        if self.pairs == None:
+            distances = self.table.distances
+            numCells = self.table.numCells
+            startIds = self.startIds
+            self.pairs = []
+            for i, a in enumerate(startIds):
+                row = a * numCells
+                self.pairs.extend([(distances[row + b], a, b) for b in startIds[i + 1:]])
+            self.pairs.sort(reverse=True)
+        left = set(ids)
+        longest = []
+        for pair in self.pairs:
+            if pair[1] in left and pair[2] in left:
+                longest.append(pair)
+                if len(longest) == self.numPairs:
+                    break
+        return longest
+
+    def __str__(self):
+        return '%d heuristic calls in %.3fs; %d food sets, %d hits, %d misses, %d evictions' % (
+            self.calls, self.time, len(self.foodSets), self.hits, self.misses, self.evictions)
 
 def mazeDistance(point1, point2, gameState):
     """
-    Returns the maze distance between any two points, using the search functions
-    you have already built. The gameState can be any game state -- Pacman's
+    Returns the maze distance between any two points, looked up in the
+    layout's DistanceTable. The gameState can be any game state -- Pacman's
     position in that state is ignored.
 
     Example usage: mazeDistance( (2,4), (5,6), gameState)
@@ -509,5 +873,4 @@ def mazeDistance(point1, point2, gameState):
     walls = gameState.getWalls()
     assert not walls[x1][y1], 'point1 is a wall: ' + str(point1)
     assert not walls[x2][y2], 'point2 is a wall: ' + str(point2)
-    prob = PositionSearchProblem(gameState, start=point1, goal=point2, warn=False, visualize=False)
-    return len(search.bfs(prob))
+    return gameState.data.layout.getDistanceTable().distance(point1, point2)
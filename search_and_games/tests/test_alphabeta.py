@@ -0,0 +1,38 @@
+import random
+import unittest
+
+import layout
+import multiAgents
+from pacman import GameState
+
+
+def midgameStates(layoutName, numStates, seed):
+    "Returns states of random games on layoutName, taken a few rounds apart."
+    random.seed(seed)
+    state = GameState()
+    state.initialize(layout.getLayout(layoutName), 2)
+    states = [state]
+    while len(states) < numStates:
+        for agentIndex in range(state.getNumAgents()):
+            if state.isWin() or state.isLose():
+                return states
+            state = state.generateSuccessor(agentIndex, random.choice(state.getLegalActions(agentIndex)))
+        states.append(state)
+    return states
+
+
+class AlphaBetaTest(unittest.TestCase):
+
+    def testRootValueEqualsMinimax(self):
+        for layoutName in ['minimaxClassic', 'smallClassic']:
+            for state in midgameStates(layoutName, 4, layoutName):
+                for depth in ['1', '2']:
+                    _, value = multiAgents.MultiPacmanAgent(depth=depth, batch='0').minimax(state, 0, 0)
+                    for ordering in sorted(multiAgents.MOVE_ORDERINGS.keys()):
+                        agent = multiAgents.AlphaBetaPacmanAgent(depth=depth, ordering=ordering)
+                        _, alphaBetaValue = agent.minimax(state, 0, 0)
+                        self.assertEqual(alphaBetaValue, value, '%s ordering on %s' % (ordering, layoutName))
+
+
+if __name__ == '__main__':
+    unittest.main()
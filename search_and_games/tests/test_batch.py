@@ -0,0 +1,27 @@
+import unittest
+
+import multiAgents
+from tests.test_alphabeta import midgameStates
+
+
+class BatchTest(unittest.TestCase):
+
+    def assertBatchedEqualsUnbatched(self, agentClass, **args):
+        states = midgameStates('minimaxClassic', 6, 'batch') + midgameStates('testClassic', 12, 'batch')
+        for state in states:
+            for depth in ['1', '2']:
+                _, value = agentClass(depth=depth, batch='0', **args).minimax(state, 0, 0)
+                for batch in [None, '1', '100']:
+                    agent = agentClass(depth=depth, batch=batch, **args)
+                    _, batchedValue = agent.minimax(state, 0, 0)
+                    self.assertAlmostEqual(batchedValue, value, 6)
+
+    def testMinimax(self):
+        self.assertBatchedEqualsUnbatched(multiAgents.MultiPacmanAgent, evalFn='featureEvaluationFunction')
+
+    def testExpectimax(self):
+        self.assertBatchedEqualsUnbatched(multiAgents.ExpectimaxPacmanAgent, evalFn='featureEvaluationFunction')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import random
+import unittest
+
+import search
+from eightpuzzle import EightPuzzleSearchProblem, EightPuzzleState, createRandomEightPuzzle, patternDatabaseHeuristic
+
+
+def distancesToGoal():
+    """
+    Returns the number of moves from every solvable 3x3 board, as a tuple of
+    tiles, to the goal, by a breadth first search back from the goal.  Moves
+    can be undone, so a search from the goal finds the same distances.
+    """
+    goal = EightPuzzleState(list(range(9)))
+    distances = {goal.tiles(): 0}
+    frontier = [goal]
+    depth = 0
+    while frontier:
+        depth += 1
+        nextFrontier = []
+        for state in frontier:
+            for move in state.legalMoves():
+                child = state.result(move)
+                tiles = child.tiles()
+                if tiles not in distances:
+                    distances[tiles] = depth
+                    nextFrontier.append(child)
+        frontier = nextFrontier
+    return distances
+
+
+class PatternDatabaseTest(unittest.TestCase):
+
+    def testNeverExceedsOptimum(self):
+        distances = distancesToGoal()
+        self.assertEqual(len(distances), 181440)
+        for tiles, distance in distances.items():
+            heuristic = patternDatabaseHeuristic(EightPuzzleState(tiles))
+            self.assertLessEqual(heuristic, distance, tiles)
+        self.assertEqual(patternDatabaseHeuristic(EightPuzzleState(list(range(9)))), 0)
+
+    def testIterativeDeepeningAStarIsOptimal(self):
+        random.seed('eightpuzzle')
+        for i in range(10):
+            puzzle = createRandomEightPuzzle(60)
+            problem = EightPuzzleSearchProblem(puzzle)
+            optimum = len(search.bfs(problem))
+            plan = search.idastar(problem, patternDatabaseHeuristic)
+            self.assertEqual(problem.getCostOfActions(plan), optimum)
+
+
+if __name__ == '__main__':
+    unittest.main()
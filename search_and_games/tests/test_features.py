@@ -0,0 +1,48 @@
+import random
+import unittest
+
+import layout
+from features import FeatureExtractor
+from pacman import GameState
+from tests.test_alphabeta import midgameStates
+
+# The food in the right-hand room and the scared ghost cannot be reached
+WALLED_OFF = layout.Layout(['%%%%%%%%%',
+                            '%P.  %. %',
+                            '%  G %%%%',
+                            '%. o %G.%',
+                            '%%%%%%%%%'])
+
+
+class ExtractBatchTest(unittest.TestCase):
+
+    def assertListMatchesBatch(self, states):
+        extractor = FeatureExtractor()
+        batch = extractor.extractBatch(states)
+        for state, row in zip(states, batch):
+            for expected, value in zip(extractor.extractRow(state), row):
+                self.assertAlmostEqual(expected, value)
+
+    def testListMatchesBatch(self):
+        self.assertListMatchesBatch(midgameStates('mediumClassic', 30, 'features'))
+
+    def testUnreachableCells(self):
+        random.seed('features')
+        state = GameState()
+        state.initialize(WALLED_OFF, 2)
+        state.data.writableAgentState(2).scaredTimer = 10
+        states = [state]
+        while len(states) < 20 and not (state.isWin() or state.isLose()):
+            for agentIndex in range(state.getNumAgents()):
+                state = state.generateSuccessor(agentIndex, random.choice(state.getLegalActions(agentIndex)))
+                if state.isWin() or state.isLose():
+                    break
+            else:
+                states.append(state)
+        self.assertListMatchesBatch(states)
+        numCells = WALLED_OFF.getDistanceTable().numCells
+        self.assertEqual(FeatureExtractor().extract(states[0])['nearestScaredGhost'], numCells)
+
+
+if __name__ == '__main__':
+    unittest.main()
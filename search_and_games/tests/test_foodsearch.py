@@ -0,0 +1,39 @@
+import unittest
+
+import layout
+import search
+from pacman import GameState
+from searchAgents import CompactFoodSearchProblem, FoodSearchProblem, foodHeuristic, foodPairHeuristic, gridHeuristic
+
+
+def foodSearchProblem(layoutName, problemType):
+    state = GameState()
+    state.initialize(layout.getLayout(layoutName), 0)
+    return problemType(state)
+
+
+def foodLeft(state, problem):
+    return problem.getFoodCount(state)
+
+
+def foodLeftOnGrid(state, problem):
+    return state[1].count()
+
+
+class FoodSearchEncodingTest(unittest.TestCase):
+
+    def testEncodingsGiveEqualCosts(self):
+        for layoutName in ['testSearch', 'tinySearch', 'trickySearch']:
+            costs = []
+            for problemType in [FoodSearchProblem, CompactFoodSearchProblem]:
+                for heuristic in [search.nullHeuristic, foodLeft, gridHeuristic(foodLeftOnGrid), foodPairHeuristic,
+                                  foodHeuristic]:
+                    problem = foodSearchProblem(layoutName, problemType)
+                    plan = search.aStarSearch(problem, heuristic)
+                    self.assertTrue(plan.statistics.found)
+                    costs.append(problem.getCostOfActions(plan))
+            self.assertEqual(costs, [costs[0]] * len(costs), layoutName)
+
+
+if __name__ == '__main__':
+    unittest.main()
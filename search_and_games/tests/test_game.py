@@ -0,0 +1,30 @@
+import random
+import unittest
+
+import ghostAgents
+import layout
+import pacmanAgents
+import textDisplay
+from pacman import ClassicGameRules
+
+
+class MoveHistoryTest(unittest.TestCase):
+
+    def playGame(self, recordHistory):
+        random.seed('history')
+        maze = layout.getLayout('smallClassic')
+        ghosts = [ghostAgents.RandomGhost(i + 1) for i in range(maze.getNumGhosts())]
+        game = ClassicGameRules().newGame(maze, [pacmanAgents.GreedyAgent()], ghosts, textDisplay.NullGraphics(), True)
+        game.run(recordHistory=recordHistory)
+        return game
+
+    def testHistoryOnlyWhenRecorded(self):
+        recorded = self.playGame(True)
+        self.assertEqual(len(recorded.moveHistory), recorded.numTurns)
+        unrecorded = self.playGame(False)
+        self.assertEqual(unrecorded.moveHistory, [])
+        self.assertEqual(unrecorded.numTurns, recorded.numTurns)
+
+
+if __name__ == '__main__':
+    unittest.main()
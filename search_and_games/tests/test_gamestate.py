@@ -0,0 +1,32 @@
+import unittest
+
+import layout
+from pacman import GameState
+
+
+class GetterCopyTest(unittest.TestCase):
+
+    def testGettersDoNotExposeState(self):
+        state = GameState()
+        state.initialize(layout.getLayout('mediumClassic'), 2)
+        key = state.key()
+        copy = state.deepCopy()
+
+        food = state.getFood()
+        x, y = state.getFoodPositions()[0]
+        food[x][y] = False
+        state.getCapsules().pop()
+        state.getGhostStates()[0].scaredTimer = 40
+        state.getGhostState(2).scaredTimer = 40
+        walls = state.getWalls()
+        walls[0][0] = False
+        self.assertTrue(state.hasWall(0, 0))
+        self.assertTrue(layout.getLayout('mediumClassic').walls[0][0])
+
+        self.assertEqual(state, copy)
+        self.assertEqual(state.key(), key)
+        self.assertEqual(state.key(), state.data.computeKey())
+
+
+if __name__ == '__main__':
+    unittest.main()
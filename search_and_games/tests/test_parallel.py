@@ -0,0 +1,28 @@
+import random
+import unittest
+
+import ghostAgents
+import layout
+import textDisplay
+from multiAgents import ParallelMultiPacmanAgent
+from pacman import ClassicGameRules
+
+
+class ParallelPoolTest(unittest.TestCase):
+
+    def testPoolStartsOnce(self):
+        random.seed('parallel')
+        maze = layout.getLayout('testClassic')
+        agent = ParallelMultiPacmanAgent(evalFn='scoreEvaluationFunction', depth='1', workers='2')
+        ghosts = [ghostAgents.RandomGhost(i + 1) for i in range(maze.getNumGhosts())]
+        # Every observation gets its own copy of the layout
+        rules = ClassicGameRules(defensiveCopies=True)
+        game = rules.newGame(maze, [agent], ghosts, textDisplay.NullGraphics(), True)
+        game.run()
+        self.assertGreater(len([index for index, _ in game.moveHistory if index == 0]), 1)
+        self.assertEqual(agent.poolsStarted, 1)
+        self.assertEqual(agent.pool, None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import random
+import unittest
+
+import layout
+import search
+from pacman import GameState
+from searchAgents import (CompactFoodSearchProblem, FoodSearchProblem, PositionSearchProblem, euclideanHeuristic,
+                          farthestFoodLegHeuristic, legDistance, manhattanHeuristic, startManhattanHeuristic)
+
+MAZES = ['tinyMaze', 'mediumMaze', 'bigMaze', 'openMaze']
+
+
+def positionProblems(numProblems, seed):
+    """
+    Yields PositionSearchProblems on each of MAZES: the layout's own, from
+    Pacman's start to (1,1), then numProblems between random open cells.
+    """
+    random.seed(seed)
+    for layoutName in MAZES:
+        state = GameState()
+        state.initialize(layout.getLayout(layoutName), 0)
+        yield PositionSearchProblem(state, warn=False, visualize=False)
+        cells = state.getWalls().asList(False)
+        for i in range(numProblems):
+            start, goal = random.sample(cells, 2)
+            yield PositionSearchProblem(state, goal=goal, start=start, warn=False, visualize=False)
+
+
+class PathCostTest(unittest.TestCase):
+
+    def assertCostsMatchBfs(self, searches, numProblems=3):
+        for problem in positionProblems(numProblems, 'search'):
+            optimum = problem.getCostOfActions(search.bfs(problem))
+            for name, searchFunction in searches:
+                plan = searchFunction(problem)
+                self.assertTrue(plan.statistics.found, name)
+                self.assertEqual(problem.getCostOfActions(plan), optimum,
+                                 '%s from %s to %s' % (name, problem.getStartState(), problem.goal))
+
+    def testIdsAndAStarMatchBfs(self):
+        self.assertCostsMatchBfs([
+            ('ids', search.ids),
+            ('astar', search.astar),
+            ('astar manhattan', lambda problem: search.astar(problem, manhattanHeuristic)),
+        ])
+
+    def testBidirectionalMatchesBfs(self):
+        self.assertCostsMatchBfs([
+            ('bidir', search.bidir),
+            ('bidir manhattan', lambda problem: search.bidir(problem, manhattanHeuristic, startManhattanHeuristic)),
+        ], numProblems=10)
+
+    def testJumpPointMatchesBfs(self):
+        self.assertCostsMatchBfs([
+            ('jps', search.jps),
+            ('jps euclidean', lambda problem: search.jps(problem, euclideanHeuristic)),
+        ], numProblems=20)
+
+    def testLegDistancesOnFoodSearch(self):
+        random.seed('legs')
+        for layoutName in ['tinySearch', 'trickySearch', 'bigSearch']:
+            state = GameState()
+            state.initialize(layout.getLayout(layoutName), 0)
+            table = state.data.layout.getDistanceTable()
+            problem = FoodSearchProblem(state)
+            cells = state.getWalls().asList(False)
+            for i in range(30):
+                start, goal = random.sample(cells, 2)
+                self.assertEqual(legDistance(problem, start, goal), table.distance(start, goal))
+
+    def testLegHeuristicOnFoodSearch(self):
+        for layoutName in ['testSearch', 'tinySearch', 'trickySearch']:
+            costs = []
+            for problemType in [FoodSearchProblem, CompactFoodSearchProblem]:
+                state = GameState()
+                state.initialize(layout.getLayout(layoutName), 0)
+                for heuristic in [search.nullHeuristic, farthestFoodLegHeuristic]:
+                    problem = problemType(state)
+                    plan = search.astar(problem, heuristic)
+                    self.assertTrue(plan.statistics.found)
+                    costs.append(problem.getCostOfActions(plan))
+            self.assertEqual(costs, [costs[0]] * len(costs), layoutName)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+import random
+import unittest
+
+import layout
+from pacman import GameState
+
+
+class ZobristKeyTest(unittest.TestCase):
+
+    def testIncrementalKeyMatchesComputedKey(self):
+        random.seed('zobrist')
+        for layoutName in ['smallClassic', 'mediumClassic', 'trickyClassic']:
+            for game in range(5):
+                state = GameState()
+                state.initialize(layout.getLayout(layoutName), 4)
+                agentIndex = 0
+                while not (state.isWin() or state.isLose()) and state.data.numFood > 0:
+                    self.assertEqual(state.key(), state.data.computeKey())
+                    action = random.choice(state.getLegalActions(agentIndex))
+                    state = state.generateSuccessor(agentIndex, action)
+                    agentIndex = (agentIndex + 1) % state.getNumAgents()
+                self.assertEqual(state.key(), state.data.computeKey())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -15,6 +15,7 @@
 import sys
 import inspect
 import heapq
+import collections
 import random
 import io
 
@@ -167,11 +168,11 @@ class Queue:
     "A container with a first-in-first-out (FIFO) queuing policy."
 
     def __init__(self):
-        self.list = []
+        self.list = collections.deque()
 
     def push(self, item):
         "Enqueue the 'item' into the queue"
-        self.list.insert(0, item)
+        self.list.appendleft(item)
 
     def pop(self):
         """
@@ -209,6 +210,9 @@ class PriorityQueue:
     def isEmpty(self):
         return len(self.heap) == 0
 
+    def __len__(self):
+        return len(self.heap)
+
     def update(self, item, priority):
         # If item already in priority queue with higher priority, update its priority and rebuild the heap.
         # If item already in priority queue with equal or lower priority, do nothing.
@@ -225,6 +229,118 @@ class PriorityQueue:
             self.push(item, priority)
 
 
+class IndexedPriorityQueue:
+    """
+    A priority queue with the interface of PriorityQueue in which update
+    takes O(log n) time.  A binary heap of [priority, count, item] entries is
+    kept together with a dict from each item to its slot in the heap, so an
+    item's entry is found without scanning the heap.  Items must be
+    hashable, and each item is queued at most once: pushing an item that is
+    already queued changes its priority.  Ties are popped first in first out.
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.slots = {}
+        self.count = 0
+
+    def push(self, item, priority):
+        slot = self.slots.get(item)
+        if slot != None:
+            self.heap[slot][0] = priority
+            self.heap[slot][2] = item
+            self.siftDown(self.siftUp(slot))
+            return
+        self.heap.append([priority, self.count, item])
+        self.count += 1
+        self.siftUp(len(self.heap) - 1)
+
+    def pop(self):
+        heap = self.heap
+        last = heap.pop()
+        if not heap:
+            del self.slots[last[2]]
+            return last[2]
+        first = heap[0]
+        heap[0] = last
+        self.siftDown(0)
+        del self.slots[first[2]]
+        return first[2]
+
+    def isEmpty(self):
+        return len(self.heap) == 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, item):
+        return item in self.slots
+
+    def getPriority(self, item):
+        return self.heap[self.slots[item]][0]
+
+    def peekPriority(self):
+        "Returns the priority of the item pop would return"
+        return self.heap[0][0]
+
+    def update(self, item, priority):
+        # If item already in priority queue with higher priority, update its priority (and the item) and restore
+        # the heap from its slot.
+        # If item already in priority queue with equal or lower priority, do nothing.
+        # If item not in priority queue, do the same thing as self.push.
+        slot = self.slots.get(item)
+        if slot == None:
+            self.push(item, priority)
+        elif priority < self.heap[slot][0]:
+            self.heap[slot][0] = priority
+            self.heap[slot][2] = item
+            self.siftUp(slot)
+
+    def siftUp(self, slot):
+        "Moves the entry at slot towards the root until its parent is smaller, and returns its new slot"
+        heap = self.heap
+        slots = self.slots
+        entry = heap[slot]
+        key = entry[0], entry[1]
+        while slot > 0:
+            parentSlot = (slot - 1) >> 1
+            parent = heap[parentSlot]
+            if (parent[0], parent[1]) <= key:
+                break
+            heap[slot] = parent
+            slots[parent[2]] = slot
+            slot = parentSlot
+        heap[slot] = entry
+        slots[entry[2]] = slot
+        return slot
+
+    def siftDown(self, slot):
+        "Moves the entry at slot towards the leaves until its children are larger"
+        heap = self.heap
+        slots = self.slots
+        size = len(heap)
+        entry = heap[slot]
+        key = entry[0], entry[1]
+        while True:
+            childSlot = 2 * slot + 1
+            if childSlot >= size:
+                break
+            child = heap[childSlot]
+            childKey = child[0], child[1]
+            rightSlot = childSlot + 1
+            if rightSlot < size:
+                right = heap[rightSlot]
+                if (right[0], right[1]) < childKey:
+                    childSlot, child, childKey = rightSlot, right, (right[0], right[1])
+            if key <= childKey:
+                break
+            heap[slot] = child
+            slots[child[2]] = slot
+            slot = childSlot
+        heap[slot] = entry
+        slots[entry[2]] = slot
+
+
 class PriorityQueueWithFunction(PriorityQueue):
     """
     Implements a priority queue with the same push/pop signature of the